@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Paketierung + Versand eines Frames (alt vs. FramePacketizer).
+
+Beispiel:
+    python bench/bench_packetizer.py --wall 4x2 --panel 128x128 --frames 500
+
+Gesendet wird an einen lokalen UDP-Sink (127.0.0.1, eigener Port), der nicht
+gelesen wird – gemessen wird also nur die Senderseite.
+"""
+import argparse, os, socket, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_argv, sys.argv = sys.argv, sys.argv[:1]   # screeny.config parst sys.argv
+from screeny.services import led as ledmod   # noqa: E402
+sys.argv = _argv
+
+import numpy as np   # noqa: E402
+
+
+def legacy_frame_bgr_blob(led, blob: bytes, last_units=True):
+    """Ursprüngliche Implementierung (pro Chunk bytearray + bytes + hdr+chunk)."""
+    led.fid = (led.fid + 1) & 0xFF
+    fid = led.fid
+    size = len(blob)
+    full = size // ledmod.FRAME_CHUNK
+    rem = size - full * ledmod.FRAME_CHUNK
+    total = full + (1 if rem > 0 else 0)
+    totH, totL = ledmod.hi_lo(total)
+    off = 0
+    for idx in range(total):
+        last = (idx == total - 1)
+        if last:
+            part = rem if rem > 0 else ledmod.FRAME_CHUNK
+            padded = ledmod.roundup32(part)
+        else:
+            part = ledmod.FRAME_CHUNK
+            padded = ledmod.FRAME_CHUNK
+        chunk = bytearray(padded)
+        chunk[:part] = blob[off:off + part]
+        off += part
+        pkH, pkL = ledmod.hi_lo(idx)
+        size_field = max(1, min(45, (part + 31) // 32)) if (last and last_units) else 45
+        hdr = bytes([ledmod.HDR0, ledmod.HDR1, ledmod.MSG_FRAME, fid, ledmod.FMT_RGB888,
+                     pkH, pkL, totH, totL, size_field])
+        led.send(hdr + chunk)
+    led._send_sync(fid, profile="video1")
+
+
+class _Recorder:
+    """Ersetzt LedBroadcaster.backend und merkt sich die Pakete (Vergleich alt/neu)."""
+    name = "recorder"
+
+    def __init__(self):
+        self.pkts = []
+
+    def send_one(self, b, addr):
+        self.pkts.append(bytes(b))
+
+    def send_burst(self, packets, addr, tail=()) -> int:
+        self.pkts.extend(bytes(b) for b in packets)
+        self.pkts.extend(bytes(b) for b in tail)
+        return 1
+
+
+def _verify(led, frame):
+    orig = led.backend
+    try:
+        rec_old, rec_new = _Recorder(), _Recorder()
+        led.fid = 0; led.backend = rec_old
+        legacy_frame_bgr_blob(led, frame.tobytes())
+        led.fid = 0; led.backend = rec_new
+        led.frame_bgr_blob(frame, sync_profile="video1")
+    finally:
+        led.backend = orig
+    return bool(rec_old.pkts) and rec_old.pkts == rec_new.pkts
+
+
+def _run(name, fn, frames, n_pkts):
+    c0, t0 = time.process_time(), time.perf_counter()
+    for f in frames:
+        fn(f)
+    c1, t1 = time.process_time(), time.perf_counter()
+    n = len(frames)
+    res = {
+        "name": name,
+        "frames": n,
+        "fps": n / max(1e-9, t1 - t0),
+        "pkts_s": n * n_pkts / max(1e-9, t1 - t0),
+        "cpu_ms_per_frame": (c1 - c0) * 1000.0 / n,
+    }
+    print(f"{name:>8}: {res['fps']:9.1f} fps  {res['pkts_s']:10.0f} pkt/s  "
+          f"{res['cpu_ms_per_frame']:7.3f} ms CPU/frame")
+    return res
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--wall", default="4x2", help="Panels, z.B. 4x2")
+    p.add_argument("--panel", default="128x128", help="Panelgröße, z.B. 128x128")
+    p.add_argument("--frames", type=int, default=300)
+    args = p.parse_args()
+
+    cols, rows = (int(x) for x in args.wall.lower().split("x"))
+    pw, ph = (int(x) for x in args.panel.lower().split("x"))
+    W, H = cols * pw, rows * ph
+
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+
+    led = ledmod.LedBroadcaster()
+    led.addr = sink.getsockname()
+    led.screen_w, led.screen_h = W, H
+
+    rng = np.random.default_rng(1)
+    frames = [rng.integers(0, 256, (H, W, 3), dtype=np.uint8) for _ in range(8)]
+    frames = (frames * (args.frames // len(frames) + 1))[:args.frames]
+    n_pkts = -(-W * H * 3 // ledmod.FRAME_CHUNK) + 1   # + 1x SYNC (video1)
+
+    print(f"wall {cols}x{rows} ({W}x{H}), {n_pkts} Pakete/Frame, identisch: {_verify(led, frames[0])}")
+    before = _run("legacy", lambda f: legacy_frame_bgr_blob(led, f.tobytes()), frames, n_pkts)
+    after = _run("zerocopy", lambda f: led.frame_bgr_blob(f, sync_profile="video1"), frames, n_pkts)
+    print(f"CPU/frame: {before['cpu_ms_per_frame'] / max(1e-9, after['cpu_ms_per_frame']):.2f}x")
+    sink.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Lauftext-Frames erzeugen (alt: Image.new + paste + np.array pro
+Frame vs. TextRenderer: Ausschnitt aus vorgerendertem Streifen).
+
+Beispiel:
+    python bench/bench_text.py --wall 4x2 --panel 128x128 --chars 2000
+
+Gemessen wird nur das Erzeugen der Frames (ohne Takt und Versand). Der
+Streifen läuft zweimal: kalt (TEXT_PLANS geleert, Plan wird kompiliert)
+und warm (Plan aus dem Cache).
+"""
+import argparse, itertools, os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_argv, sys.argv = sys.argv, sys.argv[:1]   # screeny.config parst sys.argv
+from screeny.services.text_renderer import TextRenderer, TEXT_PLANS   # noqa: E402
+sys.argv = _argv
+
+import numpy as np   # noqa: E402
+from PIL import Image, ImageDraw   # noqa: E402
+
+
+class _Wall:
+    def __init__(self, W, H):
+        self.screen_w, self.screen_h = W, H
+
+
+def legacy_scroll(W, H, text, font_size=24, speed_px_s=40, color="#ffffff", bg="#000000"):
+    """Ursprüngliche Implementierung (einzeilig, align middle/center)."""
+    fg = TextRenderer._parse_color(color)
+    bgc = TextRenderer._parse_color(bg, (0, 0, 0))
+    font = TextRenderer._load_font(font_size)
+    interval = 1.0 / TextRenderer.FPS
+    d = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+    L, T, R, B = d.multiline_textbbox((0, 0), text, font=font, spacing=max(0, int(font.size * 0.25)))
+    l, t, r, b = d.textbbox((0, 0), text, font=font)
+    block_w, block_h = r - l, max(1, B - T)
+    text_img = Image.new("RGBA", (block_w, block_h), (0, 0, 0, 0))
+    ImageDraw.Draw(text_img).text((-l, -T), text, fill=(fg[0], fg[1], fg[2], 255), font=font)
+    y_top = (H - block_h) // 2
+    speed = max(10.0, float(speed_px_s))
+    total_frames = max(1, int((block_w + W) / speed * TextRenderer.FPS))
+    x_left = float(W)
+    for _ in range(total_frames):
+        img = Image.new("RGB", (W, H), bgc)
+        img.paste(text_img, (int(round(x_left)), int(y_top)), text_img)
+        yield np.array(img, dtype=np.uint8)
+        x_left -= speed * interval
+
+
+def _run(name, gen, limit):
+    """Erstes Frame (Layout, ggf. Streifen) getrennt von den Folgeframes messen."""
+    t_s = time.perf_counter()
+    next(gen)
+    setup_ms = (time.perf_counter() - t_s) * 1000.0
+    c0, t0 = time.process_time(), time.perf_counter()
+    n = 0
+    for _ in itertools.islice(gen, limit):
+        n += 1
+    c1, t1 = time.process_time(), time.perf_counter()
+    res = {"name": name, "frames": n, "setup_ms": setup_ms, "fps": n / max(1e-9, t1 - t0),
+           "cpu_ms_per_frame": (c1 - c0) * 1000.0 / max(1, n)}
+    print(f"{name:>8}: {res['fps']:9.1f} fps  {res['cpu_ms_per_frame']:7.3f} ms CPU/frame  "
+          f"erstes Frame {setup_ms:6.1f} ms  ({n} Frames)")
+    return res
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--wall", default="4x2", help="Panels, z.B. 4x2")
+    p.add_argument("--panel", default="128x128", help="Panelgröße, z.B. 128x128")
+    p.add_argument("--chars", type=int, default=2000, help="Länge des Lauftexts")
+    p.add_argument("--font-size", type=int, default=48)
+    p.add_argument("--frames", type=int, default=1000, help="max. Frames pro Lauf")
+    args = p.parse_args()
+
+    cols, rows = (int(x) for x in args.wall.lower().split("x"))
+    pw, ph = (int(x) for x in args.panel.lower().split("x"))
+    W, H = cols * pw, rows * ph
+    text = ("Lauftext " * (args.chars // 9 + 1))[:args.chars]
+    tr = TextRenderer(_Wall(W, H))
+    cfg = dict(text=text, font_size=args.font_size, speed_px_s=200)
+
+    pairs = zip(legacy_scroll(W, H, text, args.font_size, 200), tr.render_once(**cfg))
+    same = all(np.array_equal(a, b) for a, b in itertools.islice(pairs, args.frames))
+    print(f"wall {cols}x{rows} ({W}x{H}), {args.chars} Zeichen, identisch: {same}")
+
+    before = _run("legacy", legacy_scroll(W, H, text, args.font_size, 200), args.frames)
+    TEXT_PLANS.clear()      # der Identitätscheck hat den Plan schon angelegt
+    after = _run("cold", tr.render_once(**cfg), args.frames)
+    _run("warm", tr.render_once(**cfg), args.frames)
+    print(f"CPU/frame: {before['cpu_ms_per_frame'] / max(1e-9, after['cpu_ms_per_frame']):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
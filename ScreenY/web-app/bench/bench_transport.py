@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Benchmark: LedBroadcaster gegen den nuvoLED-Simulator (headless, Loopback).
+
+Beispiel:
+    python bench/bench_transport.py --layouts 1x1,2x2,4x2,8x4 \\
+        --profiles video1,video3fast --formats rgb,jpeg --seconds 3 --out bench.json
+
+Der Simulator (../nuvoLED-sim/sim.py, braucht pygame/pillow) läuft in einem
+eigenen Prozess auf --sim-ip:2000 und meldet jeden fertig zusammengesetzten
+Frame zurück. Pro Kombination Layout/Profil/Format wird gemessen:
+- fps / packets_s:      erreichte Framerate bzw. Pakete pro Sekunde
+- cpu_ms_per_frame:     CPU-Zeit in send_frame() pro Frame (aufrufender Thread;
+                        bei transport.queue läuft der Versand im Sender-Thread)
+- process_cpu_ms_...:   CPU-Zeit des ganzen Prozesses pro Frame (inkl. Pacing)
+- reassembled / rate:   vollständig (alle Pakete) zusammengesetzte Frames / gesendete
+- displayed:            vom Simulator angezeigte Frames (auch mit Lücken)
+- latency_ms:           send_frame()-Aufruf bis Frame im Simulator fertig
+Ausgabe als JSON (stdout oder --out).
+
+Hinweis: Der Python-Simulator liest langsamer als ein Controller; bei großen
+Wänden läuft sonst sein Empfangspuffer über (--rcvbuf, transport.burst/gap).
+"""
+import argparse, json, logging, multiprocessing as mp, os, platform, queue, socket, sys, threading, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SIM_DIR = os.path.join(os.path.dirname(os.path.dirname(HERE)), "nuvoLED-sim")
+
+sys.path.insert(0, os.path.dirname(HERE))
+_argv, sys.argv = sys.argv, sys.argv[:1]   # screeny.config parst sys.argv
+from screeny.services import led as ledmod   # noqa: E402
+from screeny.services.pacing import FramePacer   # noqa: E402
+sys.argv = _argv
+
+import numpy as np   # noqa: E402
+
+
+# ------------------------------------------------
+# Simulator-Prozess
+# ------------------------------------------------
+def _sim_main(bind_ip, grid, panel, rcvbuf, events, ready):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    sys.path.insert(0, SIM_DIR)
+    import sim as simmod
+    simmod.log.setLevel(logging.WARNING)
+
+    s = simmod.NuvoSimulator(bind_ip, grid, panel)
+    if rcvbuf:
+        s.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    orig = s.handle_sync
+
+    def handle_sync(data, addr):
+        asm = s.assemblies.get(data[3]) if len(data) > 3 else None
+        complete = asm is not None and asm.received == asm.total
+        before = s.last_frame_time
+        orig(data, addr)
+        if s.last_frame_time != before:
+            events.put((s.last_frame_id, time.time(), complete))
+
+    s.handle_sync = handle_sync
+    ready.set()
+    s.run_udp()
+
+
+class SimProcess:
+    def __init__(self, bind_ip, grid, panel, rcvbuf=0):
+        ctx = mp.get_context("spawn")
+        self.events = ctx.Queue()
+        self.ready = ctx.Event()
+        self.proc = ctx.Process(target=_sim_main, args=(bind_ip, grid, panel, rcvbuf, self.events, self.ready),
+                                daemon=True)
+
+    def __enter__(self):
+        self.proc.start()
+        if not self.ready.wait(15.0):
+            raise RuntimeError("simulator did not start (pygame/pillow installed?)")
+        return self
+
+    def __exit__(self, *exc):
+        self.proc.terminate()
+        self.proc.join(2.0)
+
+
+# ------------------------------------------------
+# Messung
+# ------------------------------------------------
+def _frames(W, H, n=8):
+    """n unterschiedliche, glatte Testbilder (JPEG-freundlich, nie byte-gleich)."""
+    x = np.linspace(0, 255, W, dtype=np.float32)
+    y = np.linspace(0, 255, H, dtype=np.float32)[:, None]
+    base = np.empty((H, W, 3), dtype=np.uint8)
+    base[..., 0] = x
+    base[..., 1] = y
+    base[..., 2] = 128
+    out = []
+    for i in range(n):
+        f = base.copy()
+        x0 = (i * W) // n
+        f[:, x0:x0 + max(1, W // 16)] = 255
+        out.append(f)
+    return out
+
+
+def _pct(vals, q):
+    if not vals:
+        return None
+    vals = sorted(vals)
+    return round(vals[min(len(vals) - 1, int(q * len(vals)))], 2)
+
+
+def run_case(led, sim, cols, rows, pw, ph, profile, fmt, fps, seconds):
+    W, H = cols * pw, rows * ph
+    led.configure({"format": fmt})
+    frames = _frames(W, H)
+
+    sent = {}                 # fid -> t_send (time.time())
+    lat, done = [], {"complete": 0, "displayed": 0}
+
+    def collect():
+        while not stop.is_set() or not sim.events.empty():
+            try:
+                fid, t_done, complete = sim.events.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            t0 = sent.pop(fid, None)
+            if t0 is not None:
+                done["displayed"] += 1
+                if complete:
+                    done["complete"] += 1
+                    lat.append((t_done - t0) * 1000.0)
+
+    while not sim.events.empty():
+        sim.events.get_nowait()
+    stop = threading.Event()
+    th = threading.Thread(target=collect, daemon=True)
+    th.start()
+
+    tx0 = dict(led.tx)
+    pacer = FramePacer(fps, kind="bench") if fps > 0 else None
+    n, cpu = 0, 0.0
+    c0, t0 = time.process_time(), time.perf_counter()
+    t_end = t0 + seconds
+    while time.perf_counter() < t_end:
+        f = frames[n % len(frames)]
+        if pacer and not pacer.wait_frame(lead=min(pacer.period, led.sync_lead(profile))):
+            continue
+        sent[(led.fid + 1) & 0xFF] = time.time()
+        tc = time.thread_time()
+        led.send_frame(f, sync_profile=profile, sync_at=pacer.deadline if pacer else None)
+        cpu += time.thread_time() - tc
+        n += 1
+    led.flush()
+    c1, t1 = time.process_time(), time.perf_counter()
+    if pacer:
+        pacer.close()
+
+    time.sleep(0.3)           # letzte Frames im Simulator abwarten
+    stop.set()
+    th.join(2.0)
+
+    dt = max(1e-9, t1 - t0)
+    pkts = led.tx["packets"] - tx0["packets"]
+    return {
+        "layout": f"{cols}x{rows}",
+        "size": [W, H],
+        "profile": profile,
+        "format": fmt,
+        "target_fps": fps or None,
+        "frames": n,
+        "fps": round(n / dt, 2),
+        "packets_s": round(pkts / dt, 1),
+        "packets_per_frame": round(pkts / max(1, n), 1),
+        "mbit_s": round((led.tx["wire_bytes"] - tx0["wire_bytes"]) * 8 / dt / 1e6, 2),
+        "cpu_ms_per_frame": round(cpu * 1000.0 / max(1, n), 3),
+        "process_cpu_ms_per_frame": round((c1 - c0) * 1000.0 / max(1, n), 3),
+        "reassembled": done["complete"],
+        "reassembly_rate": round(done["complete"] / max(1, n), 4),
+        "displayed": done["displayed"],
+        "latency_ms": {"p50": _pct(lat, 0.5), "p95": _pct(lat, 0.95), "max": _pct(lat, 1.0)},
+    }
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--layouts", default="1x1,2x1,2x2,4x2,8x4", help="Panels, z.B. 1x1,4x2")
+    p.add_argument("--panel", default="128x128", help="Panelgröße")
+    p.add_argument("--profiles", default="video1,video3fast", help=",".join(ledmod.SYNC_PROFILES))
+    p.add_argument("--formats", default="rgb,jpeg", help="rgb,jpeg")
+    p.add_argument("--fps", type=float, default=25.0, help="Ziel-FPS (0 = so schnell wie möglich)")
+    p.add_argument("--seconds", type=float, default=3.0, help="Dauer pro Kombination")
+    p.add_argument("--sim-ip", default="127.0.0.2", help="Loopback-Adresse des Simulators")
+    p.add_argument("--rcvbuf", type=int, default=0, help="SO_RCVBUF des Simulators in Bytes (0 = OS-Default)")
+    p.add_argument("--transport", default="{}", help='weitere transport-Optionen als JSON')
+    p.add_argument("--out", default=None, help="JSON-Datei (sonst stdout)")
+    args = p.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    pw, ph = (int(x) for x in args.panel.lower().split("x"))
+    layouts = [tuple(int(x) for x in s.lower().split("x")) for s in args.layouts.split(",") if s]
+
+    led = ledmod.LedBroadcaster()
+    led.configure(dict(json.loads(args.transport), suppress_unchanged=False))
+    led.set_destination(args.sim_ip)
+
+    results = []
+    for cols, rows in layouts:
+        with SimProcess(args.sim_ip, (cols, rows), (pw, ph), args.rcvbuf) as sim:
+            tiles = [{"mac16": 1 + y * cols + x, "offx": x * pw, "offy": y * ph, "w": pw, "h": ph}
+                     for y in range(rows) for x in range(cols)]
+            led.send_config_layout(grid_cols=cols, grid_rows=rows, panel_w=pw, panel_h=ph,
+                                   tiles=tiles, line_nums=(0, 32))
+            time.sleep(0.2)
+            for profile in args.profiles.split(","):
+                for fmt in args.formats.split(","):
+                    r = run_case(led, sim, cols, rows, pw, ph, profile, fmt, args.fps, args.seconds)
+                    print(f"{r['layout']:>4} {profile:>10} {fmt:>4}: {r['fps']:6.1f} fps "
+                          f"{r['packets_s']:8.0f} pkt/s {r['cpu_ms_per_frame']:7.3f} ms CPU/frame "
+                          f"ok {r['reassembly_rate']*100:5.1f}%  p50 {r['latency_ms']['p50']} ms",
+                          file=sys.stderr)
+                    results.append(r)
+
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "host": platform.node(),
+            "python": platform.python_version(),
+            "backend": led.backend.name if led.backend else None,
+            "transport": {k: v for k, v in led.transport.items() if k != "format"},
+            "panel": [pw, ph],
+            "fps": args.fps,
+            "seconds": args.seconds,
+            "rcvbuf": args.rcvbuf,
+        },
+        "results": results,
+    }
+    data = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(data)
+    else:
+        print(data)
+
+
+if __name__ == "__main__":
+    main()
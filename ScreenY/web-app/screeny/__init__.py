@@ -13,6 +13,8 @@ from .config import BASE_DIR, CONFIG_FILE, LINE_NUMS, MEDIA_DIR, PLAYLIST_DIR, T
 from .logging_config import _attach_uvicorn_file_handlers, configure_logging
 from .services.led import LedBroadcaster
 from .services.player import Player
+from .services.transcode import TRANSCODER
+from .services.frame_cache import FRAME_CACHE
 from .services.scheduler import TasmotaScheduler
 
 from .routes.web import router as web_router
@@ -64,7 +66,8 @@ SCHED = TasmotaScheduler() if TasmotaScheduler else None
 def _count_media() -> int:
     try:
         total = 0
-        for root, _, files in os.walk(MEDIA_DIR):
+        for root, dirs, files in os.walk(MEDIA_DIR):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]   # .thumbs, .transcode
             total += len([f for f in files if not f.startswith(".")])
         return total
     except Exception:
@@ -154,6 +157,8 @@ async def lifespan(app: FastAPI):
     _attach_uvicorn_file_handlers()
 
     app.state.cfg = cfg_load()
+    LED.configure(app.state.cfg.get("transport"))
+    LED.configure_playback(app.state.cfg.get("playback"))
     app.state.TASMOTA_OFF_TIMER = None
     app.state.LED = LED
     app.state.PLAYER = PLAYER
@@ -171,6 +176,9 @@ async def lifespan(app: FastAPI):
         log.info("Player thread started")
 
     send_active_layout(app, line_nums=LINE_NUMS)
+    TRANSCODER.configure(app.state.cfg.get("transcode"))
+    TRANSCODER.schedule_all(LED.screen_w, LED.screen_h)
+    FRAME_CACHE.configure(app.state.cfg.get("framecache"))
 
     # ---------- MQTT starten & Callback setzen ----------
     mqtt_enabled = (app.state.cfg.get("mqtt", {}).get("enabled") 
@@ -4,6 +4,8 @@ from typing import List
 from fastapi import APIRouter, Request, Query, UploadFile, File, Body
 from fastapi.responses import HTMLResponse, JSONResponse
 from ..config import MEDIA_DIR
+from ..services.transcode import TRANSCODER
+from ..services.frame_cache import FRAME_CACHE
 from .web import templates  
 
 router = APIRouter()
@@ -14,9 +16,11 @@ def media_page(request: Request):
     return templates.TemplateResponse("media_manager.html", {"request": request})
 
 # ----- Helpers -----
-def _is_thumb_path(name: str) -> bool:
+CACHE_DIRS = (".thumbs", ".transcode", ".framecache")
+
+def _is_cache_path(name: str) -> bool:
     n = (name or "").replace("\\", "/")
-    return n.startswith(".thumbs/") or "/.thumbs/" in n or n.endswith("/.thumbs")
+    return any(n.startswith(f"{d}/") or f"/{d}/" in n or n.endswith(f"/{d}") for d in CACHE_DIRS)
 
 # ----- API: Listing -----
 @router.get("/api/media/list")
@@ -32,13 +36,13 @@ def api_media_list(
         rel_dir = os.path.relpath(dirpath, root).replace("\\", "/")
         if rel_dir == ".":
             rel_dir = ""
-        if rel_dir.startswith(".thumbs") or "/.thumbs" in rel_dir:
+        if any(rel_dir.startswith(d) or f"/{d}" in rel_dir for d in CACHE_DIRS):
             continue
         for fn in files:
             if fn.startswith("."):  
                 continue
             rel = f"{rel_dir}/{fn}" if rel_dir else fn
-            if _is_thumb_path(rel):
+            if _is_cache_path(rel):
                 continue
             path = os.path.join(dirpath, fn)
             try:
@@ -62,10 +66,21 @@ def api_media_list(
 
     return {"items": items, "total": len(items)}
 
+@router.get("/api/media/transcode")
+def api_media_transcode():
+    """Status des Transcode-Caches (Treffer, Jobs, Warteschlange)."""
+    return TRANSCODER.stats()
+
+@router.get("/api/media/framecache")
+def api_media_framecache():
+    """Status des Rohframe-Caches (Clips, Belegung, Treffer, Verdrängungen)."""
+    return FRAME_CACHE.stats()
+
 # ----- API: Upload -----
 @router.post("/api/media/upload")
-async def api_media_upload(files: List[UploadFile] = File(...)):
+async def api_media_upload(request: Request, files: List[UploadFile] = File(...)):
     os.makedirs(MEDIA_DIR, exist_ok=True)
+    led = request.app.state.LED
     for up in files:
         name = os.path.basename(up.filename)
         if not name or name.startswith("."):
@@ -73,6 +88,8 @@ async def api_media_upload(files: List[UploadFile] = File(...)):
         target = os.path.join(MEDIA_DIR, name)
         with open(target, "wb") as f:
             f.write(await up.read())
+        # Kopie in Wandauflösung im Hintergrund erzeugen
+        TRANSCODER.schedule(target, led.screen_w, led.screen_h)
     return {"status": "ok"}
 
 # ----- API: Rename -----
@@ -80,7 +97,7 @@ async def api_media_upload(files: List[UploadFile] = File(...)):
 async def api_media_rename(payload: dict = Body(...)):
     old_name = (payload.get("old_name") or "").replace("\\", "/")
     new_name = (payload.get("new_name") or "").replace("\\", "/")
-    if not old_name or not new_name or _is_thumb_path(old_name) or _is_thumb_path(new_name):
+    if not old_name or not new_name or _is_cache_path(old_name) or _is_cache_path(new_name):
         return JSONResponse({"error": "bad name"}, status_code=400)
     if old_name.startswith("/") or new_name.startswith("/") or old_name.startswith("../") or new_name.startswith("../"):
         return JSONResponse({"error": "bad path"}, status_code=400)
@@ -99,7 +116,7 @@ async def api_media_delete(payload: dict = Body(...)):
     names = payload.get("names") or []
     deleted = 0
     for rel in names:
-        if not rel or _is_thumb_path(rel):
+        if not rel or _is_cache_path(rel):
             continue
         rel = rel.replace("\\", "/")
         if rel.startswith("/") or rel.startswith("../"):
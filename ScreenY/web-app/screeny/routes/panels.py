@@ -1,11 +1,14 @@
 
 import logging, base64
 from fastapi import APIRouter, Request, Body
-from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from fastapi.templating import Jinja2Templates
 
 from ..utils.layout_store import _load_layout, _save_layout
 from ..config import LINE_NUMS, TEMPLATE_DIR
+from ..services.transcode import TRANSCODER
+from ..services.fonts import load_font
+from ..services.mjpeg import MJPEG_HUB
 
 
 log = logging.getLogger(__name__)
@@ -15,7 +18,6 @@ templates = Jinja2Templates(directory=TEMPLATE_DIR)
 @router.get("/api/panels/discover")
 def api_panels_discover(request: Request):
     led = request.app.state.LED
-    led.registry_request()
     led.discover(2.0)
     return JSONResponse([
         {
@@ -59,6 +61,7 @@ async def api_panels_send_config(payload: dict = Body(...), request: Request = N
         log.exception("publish_panel_info failed")
     led.send_gamma_identity()
     _save_layout(payload)
+    TRANSCODER.schedule_all(led.screen_w, led.screen_h)
     return {"status": "ok"}
 
 @router.post("/api/panels/test")
@@ -99,6 +102,33 @@ async def api_panels_image(payload: dict = Body(...), request: Request = None):
     led.send_frame(img_resized, sync_profile="still")
     return {"status": "ok"}
 
+@router.get("/api/panels/stats")
+def api_panels_stats(request: Request):
+    """Transport-Statistik des LedBroadcaster (Pakete/Syscalls pro Frame, ...)."""
+    return JSONResponse(request.app.state.LED.stats())
+
+@router.get("/api/panels/capture")
+def api_panels_capture_status(request: Request):
+    return JSONResponse(request.app.state.LED.capture.status())
+
+@router.post("/api/panels/capture")
+async def api_panels_capture(payload: dict = Body(None), request: Request = None):
+    """{"enabled": true, "packets": 4096} – Paketmitschnitt ein/aus."""
+    led = request.app.state.LED
+    payload = payload or {}
+    if payload.get("enabled", True):
+        led.capture_start(int(payload.get("packets") or 4096))
+    else:
+        led.capture.stop()
+    return JSONResponse(led.capture.status())
+
+@router.get("/api/panels/capture.pcap")
+def api_panels_capture_pcap(request: Request):
+    """Mitschnitt als pcap (Wireshark: Decode As -> UDP 2000)."""
+    data = request.app.state.LED.capture.to_pcap()
+    return Response(content=data, media_type="application/vnd.tcpdump.pcap",
+                    headers={"Content-Disposition": 'attachment; filename="screeny-led.pcap"'})
+
 # ------------------ Text-Stream (NEU) ------------------
 
 @router.post("/api/text/stream_url")
@@ -127,16 +157,23 @@ def api_text_stream_url(payload: dict = Body(...)):
     return {"url": f"/stream/text?token={token}"}
 
 
+@router.get("/stream/text/stats")
+def stream_text_stats():
+    """Gemeinsame /stream/text-Producer (Frames, Encode-Zeit, Zuschauer, übersprungene Frames)."""
+    return JSONResponse(MJPEG_HUB.stats())
+
+
 @router.get("/stream/text")
 def stream_text(token: str, request: Request):
     """
     MJPEG-Stream mit Text (scrollt automatisch, wenn breiter als Bildschirm).
     Kann als 'file' in der Playlist benutzt werden (is_stream=True).
+    Alle Zuschauer desselben Tokens teilen sich einen Render/Encode-Thread.
     """
     from fastapi.responses import StreamingResponse
-    import base64, json, time
+    import base64, json
     import numpy as np
-    from PIL import Image, ImageDraw, ImageFont
+    from PIL import Image, ImageDraw
     import cv2
 
     # Token decodieren
@@ -177,28 +214,6 @@ def stream_text(token: str, request: Request):
     fg = parse_color(color_str, (255,255,255))
     bg = parse_color(bg_str, (0,0,0))
 
-    # Font (Emoji-tauglich soweit möglich)
-    CANDIDATES = [
-        "DejaVuSans.ttf",
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-        "/System/Library/Fonts/Supplemental/Arial Unicode.ttf",
-        "Arial Unicode.ttf",
-    ]
-    font = None
-    for fp in CANDIDATES:
-        try:
-            font = ImageFont.truetype(fp, size=font_size); break
-        except Exception:
-            continue
-    if font is None:
-        font = ImageFont.load_default()
-
-    # Maße
-    bbox = font.getbbox(text)
-    text_w = bbox[2]-bbox[0]
-    text_h = bbox[3]-bbox[1]
-    y = max(0, (H - text_h)//2)
-
     fps = 20
     interval = 1.0 / fps
     speed = max(10, speed_px_s)
@@ -206,33 +221,42 @@ def stream_text(token: str, request: Request):
     boundary = "frame"
     headers = {"Content-Type": f"multipart/x-mixed-replace; boundary=--{boundary}"}
 
-    def make_frame(x):
-        img = Image.new("RGB", (W, H), bg)
-        ImageDraw.Draw(img).text((x, y), text, fill=fg, font=font)
-        rgb = np.array(img)
-        bgr = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
-        ok, buf = cv2.imencode(".jpg", bgr, [int(cv2.IMWRITE_JPEG_QUALITY), 80])
-        if not ok:
-            raise RuntimeError("jpeg encode failed")
-        return buf.tobytes()
-
-    def gen():
-        # passt Text in Breite? dann statisch zentriert, sonst Lauftext
-        x = max(0, (W - text_w)//2)
-        if text_w > W:
-            x = W
-        last = time.time()
-        while True:
-            now = time.time()
-            dt = now - last
-            if dt < interval:
-                time.sleep(interval - dt)
-            last = time.time()
-            if text_w > W:
-                x -= speed * interval
-                if x <= -text_w:
-                    x = W
-            frame = make_frame(int(x))
+    def factory():
+        """Läuft einmal im gemeinsamen Producer-Thread, liefert next_frame()."""
+        font = load_font(font_size)
+
+        # Maße
+        bbox = font.getbbox(text)
+        text_w = bbox[2]-bbox[0]
+        text_h = bbox[3]-bbox[1]
+        y = max(0, (H - text_h)//2)
+
+        def make_frame(x):
+            img = Image.new("RGB", (W, H), bg)
+            ImageDraw.Draw(img).text((x, y), text, fill=fg, font=font)
+            rgb = np.array(img)
+            bgr = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+            ok, buf = cv2.imencode(".jpg", bgr, [int(cv2.IMWRITE_JPEG_QUALITY), 80])
+            if not ok:
+                raise RuntimeError("jpeg encode failed")
+            return buf.tobytes()
+
+        # passt Text in Breite? dann statisch zentriert (einmal kodiert), sonst Lauftext
+        if text_w <= W:
+            still = make_frame(max(0, (W - text_w)//2))
+            return lambda: still
+
+        pos = {"x": float(W)}
+
+        def next_frame():
+            pos["x"] -= speed * interval
+            if pos["x"] <= -text_w:
+                pos["x"] = W
+            return make_frame(int(pos["x"]))
+        return next_frame
+
+    async def gen():
+        async for frame in MJPEG_HUB.frames((token, W, H), factory, fps=fps):
             yield (f"--{boundary}\r\n"
                    f"Content-Type: image/jpeg\r\n"
                    f"Content-Length: {len(frame)}\r\n\r\n").encode("ascii") + frame + b"\r\n"
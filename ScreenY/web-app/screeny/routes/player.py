@@ -3,6 +3,9 @@ from fastapi import APIRouter, Form, Request
 from fastapi.responses import JSONResponse, PlainTextResponse
 
 from ..services.playlists import pl_load
+from ..services.telemetry import TELEMETRY
+from ..services.fonts import FONTS
+from ..services.text_renderer import TEXT_PLANS
 
 router = APIRouter()
 
@@ -11,6 +14,11 @@ def api_player_state(request: Request):
     s = request.app.state.PLAYER.get_state()
     return JSONResponse(s)
 
+@router.get("/api/player/stats")
+def api_player_stats():
+    """Laufzeiten pro Playlist-Item (decode/scale/render/encode/packetize/send/sync) + Font-/Text-Cache."""
+    return JSONResponse(dict(TELEMETRY.snapshot(), fonts=FONTS.stats(), text_plans=TEXT_PLANS.stats()))
+
 @router.post("/player/next")
 def api_player_next(request: Request):
     request.app.state.PLAYER.next()
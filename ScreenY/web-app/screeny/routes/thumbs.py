@@ -10,8 +10,9 @@ from fastapi import APIRouter, Query
 from fastapi.responses import StreamingResponse, JSONResponse, RedirectResponse
 
 from ..config import MEDIA_DIR
+from ..services.fonts import load_font
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import base64, json
 
 log = logging.getLogger(__name__)
@@ -118,19 +119,6 @@ def _parse_color_hex(s: str, default=(255, 255, 255)):
         pass
     return default
 
-def _load_font(size: int):
-    for fp in [
-        "DejaVuSans.ttf",
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-        "/System/Library/Fonts/Supplemental/Arial Unicode.ttf",
-        "Arial Unicode.ttf",
-    ]:
-        try:
-            return ImageFont.truetype(fp, size=size)
-        except Exception:
-            continue
-    return ImageFont.load_default()
-
 def _render_text_thumb(token: str) -> bytes:
     # Cache-Key
     cache = _thumb_path_key(f"text|{token}|{TARGET_W}x{TARGET_H}")
@@ -142,7 +130,7 @@ def _render_text_thumb(token: str) -> bytes:
     except Exception:
         img = Image.new("RGB", (TARGET_W, TARGET_H), (0, 0, 0))
         d = ImageDraw.Draw(img)
-        f = _load_font(22)
+        f = load_font(22)
         d.text((TARGET_W//2, TARGET_H//2), "TXT", fill=(255,255,255), font=f, anchor="mm")
         bio = BytesIO(); img.save(bio, "JPEG", quality=80); bio.seek(0)
         data = bio.getvalue()
@@ -155,7 +143,7 @@ def _render_text_thumb(token: str) -> bytes:
     font_size = int(cfg.get("font_size") or 24)
 
     size = min(max(10, font_size), 28)
-    font = _load_font(size)
+    font = load_font(size)
     spacing = max(0, int(size * 0.2))
 
     img = Image.new("RGB", (TARGET_W, TARGET_H), bg)
@@ -208,14 +196,14 @@ def _render_clock_thumb(variant: str) -> bytes:
     size_date = 16 if bool_date else 0
 
     def fits(sz_time: int, sz_date: int) -> bool:
-        ft = _load_font(sz_time)
+        ft = load_font(sz_time)
         w_t = d.textbbox((0, 0), worst_time, font=ft)[2]
         h_t = d.textbbox((0, 0), worst_time, font=ft)[3]
         total_h = h_t
         total_w = max_w
 
         if bool_date:
-            fd = _load_font(sz_date)
+            fd = load_font(sz_date)
             w_d = d.textbbox((0, 0), worst_date, font=fd)[2]
             h_d = d.textbbox((0, 0), worst_date, font=fd)[3]
             gap = 6
@@ -233,12 +221,12 @@ def _render_clock_thumb(variant: str) -> bytes:
         if bool_date and size_date > 12:
             size_date -= 1
 
-    ft = _load_font(size_time)
+    ft = load_font(size_time)
     w_t, h_t = d.textbbox((0, 0), txt_time, font=ft)[2:]
     x_t = (TARGET_W - w_t) // 2
 
     if bool_date:
-        fd = _load_font(size_date)
+        fd = load_font(size_date)
         w_d, h_d = d.textbbox((0, 0), txt_date, font=fd)[2:]
         gap = 6
         total_h = h_t + gap + h_d
@@ -0,0 +1,109 @@
+import logging, os, threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+from PIL import Image, ImageSequence
+
+from .resize import ResizeCache
+
+log = logging.getLogger(__name__)
+
+ANIMATED_EXTS = (".gif", ".webp")
+MIN_DELAY_S = 0.02      # wie Browser: 0/10 ms -> 100 ms, sonst mind. 20 ms
+
+
+def is_animated_ext(name: str) -> bool:
+    return os.path.splitext((name or "").lower())[1] in ANIMATED_EXTS
+
+
+class Animation:
+    """Fertig skalierte Frames (n x H x W x 3, BGR) + Anzeigedauer je Frame (s)."""
+    __slots__ = ("frames", "delays", "total_s")
+
+    def __init__(self, frames: np.ndarray, delays: np.ndarray):
+        self.frames = frames
+        self.delays = delays
+        self.total_s = float(delays.sum())
+
+    @property
+    def nbytes(self) -> int:
+        return self.frames.nbytes + self.delays.nbytes
+
+
+class AnimationCache:
+    """
+    Animierte GIF/WebP einmal mit PIL dekodieren, auf Wandgröße skalieren und
+    als ein zusammenhängendes Array halten. Aufeinanderfolgende gleiche
+    Frames werden zusammengelegt (Delays addiert). LRU nach Bytes.
+    Nicht animierte Dateien werden ebenfalls gemerkt (None), damit der
+    Player nicht jedes Mal neu nachsieht.
+    """
+    MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lru: "OrderedDict[tuple, Optional[Animation]]" = OrderedDict()
+        self._bytes = 0
+        self._resizer = ResizeCache()
+        self.st = {"hits": 0, "misses": 0, "evicted": 0}
+
+    def get(self, src: str, W: int, H: int, mode: str = "fill") -> Optional[Animation]:
+        if not is_animated_ext(src):
+            return None
+        try:
+            st = os.stat(src)
+        except OSError:
+            return None
+        key = (os.path.abspath(src), st.st_mtime_ns, st.st_size, W, H, mode)
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                self.st["hits"] += 1
+                return self._lru[key]
+            self.st["misses"] += 1
+        try:
+            anim = self._decode(src, W, H, mode)
+        except Exception as e:
+            log.warning("animation %s: %s", src, e)
+            anim = None
+        with self._lock:
+            if key in self._lru:        # parallel schon dekodiert -> dessen Ergebnis nehmen
+                self._lru.move_to_end(key)
+                return self._lru[key]
+            self._lru[key] = anim
+            self._bytes += anim.nbytes if anim else 0
+            while self._bytes > self.MAX_BYTES and len(self._lru) > 1:
+                _, old = self._lru.popitem(last=False)
+                self._bytes -= old.nbytes if old else 0
+                self.st["evicted"] += 1
+        return anim
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.st, entries=len(self._lru), mb=round(self._bytes / 1048576, 1))
+
+    def _decode(self, src: str, W: int, H: int, mode: str) -> Optional[Animation]:
+        with Image.open(src) as img:
+            if not getattr(img, "is_animated", False):
+                return None
+            frames, delays = [], []
+            for fr in ImageSequence.Iterator(img):
+                d = float(fr.info.get("duration") or 0) / 1000.0
+                d = 0.1 if d <= 0.01 else max(MIN_DELAY_S, d)
+                rgba = np.asarray(fr.convert("RGBA"))
+                # Transparenz auf Schwarz, RGB -> BGR
+                a = rgba[..., 3:4].astype(np.uint16)
+                bgr = ((rgba[..., 2::-1].astype(np.uint16) * a) // 255).astype(np.uint8)
+                out = self._resizer.resize(bgr, W, H, mode)
+                if frames and np.array_equal(frames[-1], out):
+                    delays[-1] += d
+                    continue
+                frames.append(np.array(out))
+                delays.append(d)
+        if len(frames) < 2:
+            return None
+        return Animation(np.stack(frames), np.asarray(delays, dtype=np.float64))
+
+
+ANIMATIONS = AnimationCache()
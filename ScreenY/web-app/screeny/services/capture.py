@@ -0,0 +1,109 @@
+import socket, struct, threading, time
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+# pcap: LINKTYPE_RAW (IPv4 ohne Ethernet), IP/UDP-Header werden beim Export erzeugt
+PCAP_MAGIC = 0xA1B2C3D4
+LINKTYPE_RAW = 101
+SNAPLEN = 1472            # max. UDP-Payload bei MTU 1500
+
+
+class PacketCapture:
+    """
+    Ringpuffer für gesendete UDP-Pakete (Transport-Debugging im Betrieb).
+    Auf dem Sendepfad wird nur kopiert (Bytes + Zeitstempel + Ziel), keine
+    Formatierung. Ist die Aufzeichnung aus, kostet sie genau einen
+    Attribut-Check pro Burst.
+
+        cap.start(4096)
+        ...
+        pcap_bytes = cap.to_pcap()
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._alloc(0)
+        self.src = ("0.0.0.0", 0)
+
+    def _alloc(self, n: int):
+        self.size = n
+        self._buf = np.zeros((n, SNAPLEN), dtype=np.uint8)
+        self._len = np.zeros(n, dtype=np.int32)
+        self._ts = np.zeros(n, dtype=np.float64)
+        self._dst = [None] * n
+        self._pos = 0          # nächster Schreibplatz
+        self._count = 0        # insgesamt aufgezeichnet (auch überschriebene)
+
+    def start(self, packets: int = 4096, src: Optional[tuple] = None):
+        packets = max(16, min(int(packets or 4096), 1 << 16))
+        with self._lock:
+            if packets != self.size:
+                self._alloc(packets)
+            else:
+                self._pos = self._count = 0
+            if src:
+                self.src = src
+            self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def record(self, packets: Sequence, addr, tail: Sequence = ()):
+        ts = time.time()
+        with self._lock:
+            n = self.size
+            if not n:
+                return
+            for seq in (packets, tail):
+                for b in seq:
+                    i = self._pos
+                    k = min(len(b), SNAPLEN)
+                    self._buf[i, :k] = np.frombuffer(b, dtype=np.uint8, count=k)
+                    self._len[i] = len(b)
+                    self._ts[i] = ts
+                    self._dst[i] = addr
+                    self._pos = (i + 1) % n
+                    self._count += 1
+
+    def status(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "size": self.size,
+                "captured": self._count, "stored": min(self._count, self.size)}
+
+    # --- Export ---
+    def to_pcap(self) -> bytes:
+        with self._lock:
+            n = min(self._count, self.size)
+            start = (self._pos - n) % self.size if self.size else 0
+            order = [(start + j) % self.size for j in range(n)]
+            rows = [(self._ts[i], int(self._len[i]), self._buf[i].tobytes(), self._dst[i]) for i in order]
+        out = bytearray(struct.pack("<IHHiIII", PCAP_MAGIC, 2, 4, 0, 0, 65535, LINKTYPE_RAW))
+        src_ip = _ip4(self.src[0])
+        sport = int(self.src[1]) & 0xFFFF
+        for ts, length, data, dst in rows:
+            payload = data[:min(length, SNAPLEN)]
+            pkt = _ipv4_udp(src_ip, sport, _ip4(dst[0]), int(dst[1]), payload, length)
+            sec = int(ts)
+            out += struct.pack("<IIII", sec, int((ts - sec) * 1e6), len(pkt), 28 + length)
+            out += pkt
+        return bytes(out)
+
+
+def _ip4(host: str) -> bytes:
+    try:
+        return socket.inet_aton(host)
+    except OSError:
+        return socket.inet_aton(socket.gethostbyname(host))
+
+
+def _ipv4_udp(src: bytes, sport: int, dst: bytes, dport: int, payload: bytes, orig_len: int) -> bytes:
+    """Minimale IPv4/UDP-Header (UDP-Prüfsumme 0 = nicht gesetzt)."""
+    total = 20 + 8 + orig_len
+    hdr = struct.pack("!BBHHHBBH4s4s", 0x45, 0, total & 0xFFFF, 0, 0x4000, 64, 17, 0, src, dst)
+    csum = sum(struct.unpack("!10H", hdr))
+    csum = (csum & 0xFFFF) + (csum >> 16)
+    csum = ~((csum & 0xFFFF) + (csum >> 16)) & 0xFFFF
+    hdr = hdr[:10] + struct.pack("!H", csum) + hdr[12:]
+    udp = struct.pack("!HHHH", sport, dport & 0xFFFF, (8 + orig_len) & 0xFFFF, 0)
+    return hdr + udp + payload
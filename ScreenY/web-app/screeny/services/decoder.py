@@ -0,0 +1,167 @@
+import logging, queue, threading, time
+from typing import Any, Dict, Optional
+
+import cv2, numpy as np
+
+from .resize import ResizeCache
+from .telemetry import TELEMETRY
+
+log = logging.getLogger(__name__)
+
+
+class DecodeStats:
+    """Prozessweite Zähler der Decoder-Stufe (für /api/panels/stats)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.c = {"decoded": 0, "skipped": 0, "dropped": 0, "underruns": 0}
+            self.busy_s = 0.0
+            self.fps_ema = 0.0
+
+    def add(self, key: str, n: int = 1):
+        with self._lock:
+            self.c[key] += n
+
+    def decoded(self, dt: float):
+        with self._lock:
+            self.c["decoded"] += 1
+            self.busy_s += dt
+            if dt > 0:
+                f = 1.0 / dt
+                self.fps_ema = f if not self.fps_ema else self.fps_ema * 0.9 + f * 0.1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self.c)
+            s["decode_fps"] = round(self.fps_ema, 1)
+            s["decode_fps_avg"] = round(s["decoded"] / self.busy_s, 1) if self.busy_s > 0 else None
+        return s
+
+
+DECODE_STATS = DecodeStats()
+
+
+class ReadAheadDecoder:
+    """
+    Dekodiert und skaliert in einem eigenen Thread vor und hält bis zu
+    `depth` fertige Frames in Wandgröße bereit. Ein langsames cap.read()
+    verzögert so nicht mehr den Versand.
+
+    Frames sind im Ziel-Takt nummeriert (k = 0, 1, 2 ... bei fps). Hängt der
+    Sender hinterher, setzt er seek(k): der Decoder springt dann per grab()
+    (ohne Farbkonvertierung/Resize) zum Frame, der laut Uhr dran ist.
+
+        dec = ReadAheadDecoder(cap, W, H, mode, ratio=src_fps / fps)
+        while (item := dec.get()) is not None:
+            k, frame = item
+            ...
+            dec.release(frame)
+        dec.close()
+
+    Die Capture gehört ab dann dem Decoder: er gibt sie beim Beenden in
+    seinem eigenen Thread frei, nie während ein read() noch läuft.
+    """
+
+    def __init__(self, cap, W: int, H: int, mode: str = "fill", *, ratio: float = 1.0,
+                 depth: int = 3, first: Optional[np.ndarray] = None, loop: bool = False,
+                 stats: DecodeStats = DECODE_STATS):
+        self.cap = cap
+        self.W, self.H, self.mode = W, H, mode
+        self.ratio = max(1e-6, float(ratio))
+        self.loop = loop
+        self.stats = stats
+        self._first = first
+        self._resizer = ResizeCache()
+        # Ring: depth fertige Frames + je einer in Arbeit bei Decoder und Sender
+        self._free: "queue.Queue[np.ndarray]" = queue.Queue()
+        for _ in range(max(1, int(depth)) + 2):
+            self._free.put(np.empty((H, W, 3), dtype=np.uint8))
+        self._ready: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._want = 0
+        self.failed = False         # vorzeitig beendet (Fehler), nicht Clipende
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="decoder")
+        self._thread.start()
+
+    # --- Sender ---
+    def get(self, timeout: float = 0.1):
+        """(k, frame) oder None am Ende. Wirft queue.Empty, wenn noch nichts bereitliegt."""
+        try:
+            return self._ready.get_nowait()
+        except queue.Empty:
+            self.stats.add("underruns")
+        return self._ready.get(timeout=timeout)
+
+    def pending(self) -> int:
+        """Anzahl fertiger Frames im Ring."""
+        return self._ready.qsize()
+
+    def release(self, frame: np.ndarray):
+        self._free.put(frame)
+
+    def seek(self, k: int):
+        """Frames vor k nicht mehr dekodieren."""
+        if k > self._want:
+            self._want = k
+
+    def close(self):
+        """Stoppen; cap.release() erledigt der Decoder-Thread selbst."""
+        self._stopping.set()
+        self._thread.join(2.0)
+
+    # --- Decoder-Thread ---
+    def _run(self):
+        cap, ratio = self.cap, self.ratio
+        k, pos, k0 = 0, 0, 0          # nächster Ziel-Frame, gelesene Quell-Frames, k bei pos 0
+        try:
+            while not self._stopping.is_set():
+                try:
+                    buf = self._free.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                t0 = time.perf_counter()
+                if self._want > k:
+                    self.stats.add("skipped", self._want - k)
+                    k = self._want
+                # Quell-Frame zu Ziel-Frame k; alles davor nur grab()
+                src_i = int((k - k0) * ratio + 1e-6)
+                frame = None
+                if self._first is not None:
+                    if src_i == 0:
+                        frame = self._first
+                    self._first, pos = None, 1
+                if frame is None:
+                    while pos < src_i and cap.grab():
+                        pos += 1
+                    ok, frame = cap.read()
+                    pos += 1
+                    if not ok:
+                        frame = None
+                if frame is None:
+                    self._free.put(buf)
+                    if self.loop and pos > 1:
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        pos, k0 = 0, k
+                        continue
+                    break
+                t1 = time.perf_counter()
+                np.copyto(buf, self._resizer.resize(frame, self.W, self.H, self.mode))
+                t2 = time.perf_counter()
+                TELEMETRY.add("decode", t1 - t0)
+                TELEMETRY.add("scale", t2 - t1)
+                self.stats.decoded(t2 - t0)
+                self._ready.put((k, buf))
+                k += 1
+        except Exception as e:
+            self.failed = True
+            log.warning("decoder stopped: %s", e)
+        finally:
+            try:
+                cap.release()
+            except Exception as e:
+                log.debug("capture release failed: %s", e)
+            self._ready.put(None)
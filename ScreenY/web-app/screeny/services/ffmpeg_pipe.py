@@ -0,0 +1,130 @@
+import logging, shutil, subprocess
+from typing import Optional
+
+import cv2, numpy as np
+
+log = logging.getLogger(__name__)
+
+FFMPEG = shutil.which("ffmpeg")
+
+
+def scale_filter(W: int, H: int, mode: str = "fill") -> str:
+    """ffmpeg-Filter auf exakt WxH: fill = zuschneiden, fit = Letterbox."""
+    if mode == "fit":
+        return (f"scale={W}:{H}:force_original_aspect_ratio=decrease,"
+                f"pad={W}:{H}:(ow-iw)/2:(oh-ih)/2:black")
+    return f"scale={W}:{H}:force_original_aspect_ratio=increase,crop={W}:{H}"
+
+
+class FFmpegCapture:
+    """
+    Decoder über eine ffmpeg-Pipe (rawvideo, bgr24). Skalierung, FPS-Wandlung
+    und Pixelformat erledigt ffmpeg, heraus kommen fertige Frames in exakt
+    Wandgröße. Gelesen wird per readinto() in einen festen Puffer – read()
+    liefert eine Sicht darauf, die beim nächsten read() überschrieben wird.
+
+    Schnittstelle wie cv2.VideoCapture (isOpened/read/grab/get/set/release),
+    damit play_video/play_stream und der ReadAheadDecoder beides nehmen.
+    """
+
+    def __init__(self, src: str, W: int, H: int, mode: str = "fill",
+                 fps: Optional[float] = None, stream: bool = False):
+        self.src, self.W, self.H, self.mode = src, W, H, mode
+        self.stream = stream
+        # Dateien nie über die Quell-FPS hinaus (fps-Filter würde Frames doppeln)
+        self.fps = self._probe_fps() if not stream else 25.0
+        if fps and fps > 0:
+            self.fps = min(fps, self.fps) if not stream else fps
+        self.size = W * H * 3
+        self._buf = bytearray(self.size)
+        self._mv = memoryview(self._buf)
+        self._frame = np.frombuffer(self._buf, dtype=np.uint8).reshape(H, W, 3)
+        self.proc: Optional[subprocess.Popen] = None
+        self._start()
+
+    def _probe_fps(self) -> float:
+        cap = cv2.VideoCapture(self.src)     # nur Header lesen
+        try:
+            return cap.get(cv2.CAP_PROP_FPS) or 30.0
+        finally:
+            cap.release()
+
+    def _start(self):
+        if not FFMPEG:
+            return
+        cmd = [FFMPEG, "-nostdin", "-v", "error"]
+        if self.stream:
+            cmd += ["-fflags", "nobuffer", "-flags", "low_delay", "-rw_timeout", "5000000"]
+            if self.src.lower().startswith("rtsp://"):
+                cmd += ["-rtsp_transport", "tcp"]
+        cmd += ["-i", self.src, "-an", "-sn",
+                "-vf", f"fps={self.fps:g},{scale_filter(self.W, self.H, self.mode)}",
+                "-pix_fmt", "bgr24", "-f", "rawvideo", "pipe:1"]
+        try:
+            self.proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                         bufsize=self.size * 2)
+        except OSError as e:
+            log.warning("ffmpeg start failed: %s", e)
+            self.proc = None
+
+    # --- VideoCapture-Schnittstelle ---
+    def isOpened(self) -> bool:
+        return self.proc is not None and self.proc.poll() in (None, 0)
+
+    def grab(self) -> bool:
+        if self.proc is None:
+            return False
+        out, mv, n = self.proc.stdout, self._mv, 0
+        while n < self.size:
+            r = out.readinto(mv[n:])
+            if not r:
+                return False
+            n += r
+        return True
+
+    def read(self):
+        if self.grab():
+            return True, self._frame
+        return False, None
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.W)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.H)
+        return 0.0
+
+    def set(self, prop: int, value) -> bool:
+        if prop == cv2.CAP_PROP_POS_FRAMES and not value and not self.stream:
+            self.release()       # Loop: von vorn
+            self._start()
+            return True
+        return False
+
+    def release(self):
+        p, self.proc = self.proc, None
+        if p is None:
+            return
+        try:
+            p.kill()
+            p.stdout.close()
+            p.wait(1.0)
+        except Exception:
+            pass
+
+
+def open_capture(backend: str, src: str, W: int, H: int, mode: str = "fill",
+                 fps: Optional[float] = None, stream: bool = False):
+    """Capture für playback.decoder: 'opencv' (Standard), 'ffmpeg' oder 'auto'."""
+    backend = (backend or "opencv").lower()
+    if backend in ("ffmpeg", "auto") and FFMPEG:
+        return FFmpegCapture(src, W, H, mode, fps=fps, stream=stream)
+    if backend == "ffmpeg":
+        log.warning("playback.decoder=ffmpeg, but ffmpeg not found -> opencv")
+    if stream:
+        # blockierende Reads/Verbindungsaufbau per Timeout abbrechen (Reconnect im StreamIngest)
+        return cv2.VideoCapture(src, cv2.CAP_ANY, [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, 5000,
+                                                   cv2.CAP_PROP_READ_TIMEOUT_MSEC, 5000])
+    return cv2.VideoCapture(src)
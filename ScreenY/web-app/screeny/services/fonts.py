@@ -0,0 +1,90 @@
+import logging, threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from PIL import ImageFont
+
+log = logging.getLogger(__name__)
+
+# Kandidaten je Familie, der erste ladbare gewinnt (Emoji-tauglich soweit möglich)
+FONT_CANDIDATES = {
+    "sans": [
+        "DejaVuSans.ttf",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+        "/System/Library/Fonts/Supplemental/Arial Unicode.ttf",
+        "Arial Unicode.ttf",
+    ],
+}
+
+
+class FontService:
+    """
+    Prozessweiter Font-Cache für alle Renderer (Player-Text, Thumbnails,
+    /stream/text, MQTT-Vorschau). Die Kandidatenpfade einer Familie werden
+    einmal durchprobiert, danach liegt jede (Familie, Größe) in einem LRU –
+    FreeType-Objekte samt ihrem Glyph-Cache werden wiederverwendet statt bei
+    jedem Render neu geladen.
+
+        font = FONTS.get(24)
+    """
+    MAX_FONTS = 64
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._paths: Dict[str, Optional[str]] = {}
+        self._lru: "OrderedDict[tuple, Any]" = OrderedDict()
+        self.st = {"hits": 0, "misses": 0, "evicted": 0, "probes": 0}
+
+    def path(self, family: str = "sans") -> Optional[str]:
+        """Erster ladbarer Kandidat der Familie (None = PIL-Standardfont)."""
+        with self._lock:
+            if family in self._paths:
+                return self._paths[family]
+        found = None
+        for fp in FONT_CANDIDATES.get(family) or FONT_CANDIDATES["sans"]:
+            self.st["probes"] += 1
+            try:
+                ImageFont.truetype(fp, size=10)
+                found = fp
+                break
+            except Exception:
+                continue
+        if found is None:
+            log.warning("no TrueType font for '%s' found, using PIL default", family)
+        with self._lock:
+            self._paths[family] = found
+        return found
+
+    def get(self, size: int, family: str = "sans"):
+        key = (family, int(size))
+        with self._lock:
+            font = self._lru.get(key)
+            if font is not None:
+                self._lru.move_to_end(key)
+                self.st["hits"] += 1
+                return font
+        self.st["misses"] += 1
+        fp = self.path(family)
+        try:
+            font = ImageFont.truetype(fp, size=key[1]) if fp else ImageFont.load_default()
+        except Exception:
+            font = ImageFont.load_default()
+        with self._lock:
+            self._lru[key] = font
+            while len(self._lru) > self.MAX_FONTS:
+                self._lru.popitem(last=False)
+                self.st["evicted"] += 1
+        return font
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            n = self.st["hits"] + self.st["misses"]
+            return dict(self.st, fonts=len(self._lru), paths=dict(self._paths),
+                        hit_rate=round(self.st["hits"] / n, 3) if n else None)
+
+
+FONTS = FontService()
+
+
+def load_font(size: int, family: str = "sans"):
+    return FONTS.get(size, family)
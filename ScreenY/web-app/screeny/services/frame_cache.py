@@ -0,0 +1,279 @@
+import hashlib, json, logging, os, threading, time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from ..config import MEDIA_DIR
+
+log = logging.getLogger(__name__)
+
+FRAME_CACHE_DIR = os.path.join(MEDIA_DIR, ".framecache")
+
+
+class CachedClip:
+    """Fertig skalierter Clip als memmap (frames x H x W x 3, BGR)."""
+
+    def __init__(self, path: str, meta: Dict[str, Any]):
+        self.path = path
+        self.meta = meta
+        self.fps = float(meta["fps"])
+        self.frames = np.memmap(path, dtype=np.uint8, mode="r",
+                                shape=(int(meta["frames"]), int(meta["h"]), int(meta["w"]), 3))
+
+    def __len__(self):
+        return self.frames.shape[0]
+
+
+class ClipRecorder:
+    """
+    Schreibt beim ersten Abspielen die Frames mit, die der Player ohnehin
+    dekodiert und skaliert – kein zweiter Decoder neben der Wiedergabe.
+    Übernommen wird nur eine lückenlose Aufnahme bis zum Clipende; springt
+    der Decoder (Last) oder wird abgebrochen, fällt sie weg und der nächste
+    Durchlauf versucht es erneut.
+
+        rec = FRAME_CACHE.recorder(src, W, H, mode)
+        if rec and rec.start(fps):
+            rec.add(k, frame)           # False = Aufnahme verworfen
+        rec.finish()                    # bzw. rec.abort()
+    """
+
+    def __init__(self, cache: "FrameCache", key: str, src: str, W: int, H: int, mode: str):
+        self.cache, self.key, self.src = cache, key, src
+        self.W, self.H, self.mode = W, H, mode
+        self.fps = 0.0
+        self.n = 0
+        self.limit = 0
+        self.tmp = os.path.join(cache.root, f".{key}.raw.tmp")
+        self._f = None
+        self._done = False
+        self._t0 = 0.0
+
+    def start(self, fps: float) -> bool:
+        self.fps = float(fps)
+        self.limit = self.cache._max_frames(self.fps, self.W * self.H * 3)
+        if self.limit <= 0:
+            self.cache._skip_key(self.key)
+            self.abort()
+            return False
+        try:
+            os.makedirs(self.cache.root, exist_ok=True)
+            self._f = open(self.tmp, "wb")
+        except OSError as e:
+            log.warning("frame cache: cannot record %s: %s", self.src, e)
+            self.abort()
+            return False
+        self._t0 = time.perf_counter()
+        return True
+
+    def add(self, k: int, frame: np.ndarray) -> bool:
+        if self._f is None:
+            return False
+        if k != self.n:
+            self.abort()            # Decoder hat Frames übersprungen
+            return False
+        if self.n >= self.limit:
+            self.cache._skip_key(self.key)    # länger als max_seconds / Budget
+            self.abort()
+            return False
+        try:
+            self._f.write(np.ascontiguousarray(frame).data)
+        except OSError as e:
+            log.warning("frame cache: recording %s failed: %s", self.src, e)
+            self.abort()
+            return False
+        self.n += 1
+        return True
+
+    def finish(self):
+        """Clip vollständig gelaufen -> Aufnahme in den Cache übernehmen."""
+        if self._f is None:
+            self.abort()
+            return
+        f, self._f = self._f, None
+        try:
+            f.close()
+            if self.n == 0:
+                raise RuntimeError("no frames recorded")
+            self.cache._commit(self)
+        except Exception as e:
+            log.warning("frame cache: %s not stored: %s", self.src, e)
+            self._remove_tmp()
+        finally:
+            self._end()
+
+    def abort(self):
+        f, self._f = self._f, None
+        if f is not None:
+            try: f.close()
+            except OSError: pass
+            self._remove_tmp()
+            self.cache.st["aborted"] += 1
+        self._end()
+
+    def _remove_tmp(self):
+        try: os.remove(self.tmp)
+        except OSError: pass
+
+    def _end(self):
+        if not self._done:
+            self._done = True
+            self.cache._release(self.key)
+
+
+class FrameCache:
+    """
+    Dekodierte, auf Wandgröße skalierte Kurzclips als Rohdatei (memmap).
+    Wiederholungen (loop > 1, Playlist im repeat-Modus) lesen die Frames dann
+    ohne Decoder direkt aus dem Page-Cache.
+
+    - Aufnahme beim ersten Abspielen aus den Frames des Players (recorder())
+    - nur Clips bis max_seconds, die ins Budget (budget_mb) passen
+    - LRU über alle Clips: vor dem Übernehmen werden die am längsten nicht
+      benutzten Clips gelöscht, bis der neue Platz hat
+    """
+
+    def __init__(self, root: str = FRAME_CACHE_DIR):
+        self.root = root
+        self.cfg = {"enabled": True, "budget_mb": 256, "max_seconds": 20}
+        self._lru: "OrderedDict[str, int]" = OrderedDict()   # key -> Bytes, ältester zuerst
+        self._loaded = False
+        self._skip = set()          # zu lang / zu groß / defekt
+        self._recording = set()
+        self._cv = threading.Condition()
+        self.st = {"hits": 0, "misses": 0, "built": 0, "evicted": 0, "skipped": 0, "aborted": 0}
+
+    def configure(self, cfg: Optional[Dict[str, Any]]):
+        if cfg:
+            self.cfg.update({k: v for k, v in cfg.items() if v is not None})
+
+    @property
+    def budget(self) -> int:
+        return int(float(self.cfg.get("budget_mb") or 0) * 1024 * 1024)
+
+    def _key(self, src: str, W: int, H: int, mode: str) -> Optional[str]:
+        try:
+            st = os.stat(src)
+        except OSError:
+            return None
+        k = f"{os.path.abspath(src)}|{st.st_mtime_ns}|{st.st_size}|{W}x{H}|{mode}"
+        return hashlib.sha256(k.encode("utf-8")).hexdigest()[:16]
+
+    def _paths(self, key: str):
+        return os.path.join(self.root, f"{key}.raw"), os.path.join(self.root, f"{key}.json")
+
+    def _load_index(self):
+        """Vorhandene Clips einlesen (LRU-Reihenfolge nach mtime)."""
+        if self._loaded:
+            return
+        self._loaded = True
+        entries = []
+        try:
+            for fn in os.listdir(self.root):
+                if fn.endswith(".raw") and not fn.startswith("."):
+                    p = os.path.join(self.root, fn)
+                    st = os.stat(p)
+                    entries.append((st.st_mtime, fn[:-4], st.st_size))
+        except OSError:
+            return
+        for _, key, size in sorted(entries):
+            self._lru[key] = size
+
+    # --- Player ---
+    def lookup(self, src: str, W: int, H: int, mode: str) -> Optional[CachedClip]:
+        """Fertigen Clip öffnen (None = noch nicht im Cache)."""
+        if not self._usable():
+            return None
+        key = self._key(src, W, H, mode)
+        if not key or key in self._skip:
+            return None
+        raw, meta_p = self._paths(key)
+        with self._cv:
+            self._load_index()
+            known = key in self._lru
+            if known:
+                self._lru.move_to_end(key)
+        if known:
+            try:
+                with open(meta_p, "r", encoding="utf-8") as f:
+                    clip = CachedClip(raw, json.load(f))
+                os.utime(raw)       # LRU über Neustarts hinweg
+                self.st["hits"] += 1
+                return clip
+            except Exception as e:
+                log.debug("frame cache %s unreadable: %s", key, e)
+                with self._cv:
+                    self._drop(key)
+        self.st["misses"] += 1
+        return None
+
+    def recorder(self, src: str, W: int, H: int, mode: str) -> Optional[ClipRecorder]:
+        """Aufnahme für play_video(record=...); None = nicht nötig / nicht möglich."""
+        if not self._usable():
+            return None
+        key = self._key(src, W, H, mode)
+        if not key or key in self._skip:
+            return None
+        with self._cv:
+            self._load_index()
+            if key in self._lru or key in self._recording:
+                return None
+            self._recording.add(key)
+        return ClipRecorder(self, key, src, W, H, mode)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cv:
+            used = sum(self._lru.values())
+            s = dict(self.st, clips=len(self._lru), recording=len(self._recording))
+        s["used_mb"] = round(used / 1048576, 1)
+        s["budget_mb"] = round(self.budget / 1048576, 1)
+        return s
+
+    # --- intern ---
+    def _drop(self, key: str):
+        self._lru.pop(key, None)
+        for p in self._paths(key):
+            try: os.remove(p)
+            except OSError: pass
+
+    def _make_room(self, need: int):
+        while self._lru and sum(self._lru.values()) + need > self.budget:
+            old = next(iter(self._lru))
+            self._drop(old)
+            self.st["evicted"] += 1
+
+    def _usable(self) -> bool:
+        return bool(self.cfg.get("enabled", True)) and self.budget > 0
+
+    def _max_frames(self, fps: float, frame_bytes: int) -> int:
+        n = int(float(self.cfg.get("max_seconds") or 0) * fps + 1e-6)
+        return min(n, self.budget // max(1, frame_bytes))
+
+    def _skip_key(self, key: str):
+        with self._cv:
+            if key not in self._skip:
+                self._skip.add(key)
+                self.st["skipped"] += 1
+
+    def _release(self, key: str):
+        with self._cv:
+            self._recording.discard(key)
+
+    def _commit(self, rec: ClipRecorder):
+        size = rec.n * rec.H * rec.W * 3
+        raw, meta_p = self._paths(rec.key)
+        with self._cv:
+            self._load_index()
+            self._make_room(size)
+            with open(meta_p, "w", encoding="utf-8") as f:
+                json.dump({"frames": rec.n, "w": rec.W, "h": rec.H, "fps": rec.fps, "mode": rec.mode,
+                           "src": os.path.basename(rec.src)}, f)
+            os.replace(rec.tmp, raw)
+            self._lru[rec.key] = size
+            self.st["built"] += 1
+        log.info("frame cache: %s %d frames %dx%d (%.1f MB, %.1fs)", os.path.basename(rec.src),
+                 rec.n, rec.W, rec.H, size / 1048576, time.perf_counter() - rec._t0)
+
+
+FRAME_CACHE = FrameCache()
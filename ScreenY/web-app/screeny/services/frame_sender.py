@@ -0,0 +1,117 @@
+import threading, time, logging
+from collections import deque
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+POLICIES = ("block", "drop_oldest", "latest")
+
+
+class FrameSender(threading.Thread):
+    """
+    Eigener Sende-Thread für den LedBroadcaster.
+    Frames (fertig skaliert, BGR) werden in vorbelegte Slots kopiert und über
+    eine begrenzte Queue an send_fn(frame, sync_profile, sync_at, t_in)
+    übergeben – so überlappt das Dekodieren von Frame N+1 mit dem Versand
+    von Frame N.
+
+    Policies:
+    - block:       Producer wartet, bis ein Platz frei ist
+    - drop_oldest: ältesten wartenden Frame verwerfen
+    - latest:      nur der neueste Frame wartet (max. 1 in der Queue)
+    """
+
+    def __init__(self, send_fn: Callable[..., None], *,
+                 policy: str = "drop_oldest", maxsize: int = 2):
+        super().__init__(daemon=True, name="led-sender")
+        if policy not in POLICIES:
+            log.warning("unknown queue policy %r, using drop_oldest", policy)
+            policy = "drop_oldest"
+        self.send_fn = send_fn
+        self.policy = policy
+        self.maxsize = 1 if policy == "latest" else max(1, int(maxsize or 1))
+        self._q: deque = deque()
+        self._free: list = []
+        self._cv = threading.Condition()
+        self._stopping = False
+        self._busy = False
+        self.st = {"enqueued": 0, "sent": 0, "dropped": 0, "errors": 0,
+                   "max_depth": 0, "blocked_ms": 0.0}
+
+    # --- Producer ---
+    def _slot(self, frame: np.ndarray) -> np.ndarray:
+        while self._free:
+            buf = self._free.pop()
+            if buf.shape == frame.shape and buf.dtype == frame.dtype:
+                return buf
+        return np.empty_like(frame)
+
+    def submit(self, frame: np.ndarray, sync_profile: str, sync_at=None, t_in=None):
+        with self._cv:
+            if self.policy == "block":
+                t0 = time.perf_counter()
+                while len(self._q) >= self.maxsize and not self._stopping:
+                    self._cv.wait(0.5)
+                self.st["blocked_ms"] += (time.perf_counter() - t0) * 1000.0
+            else:
+                while len(self._q) >= self.maxsize:
+                    old = self._q.popleft()[0]
+                    self._free.append(old)
+                    self.st["dropped"] += 1
+            buf = self._slot(frame)
+            np.copyto(buf, frame)
+            self._q.append((buf, sync_profile, sync_at, t_in))
+            self.st["enqueued"] += 1
+            if len(self._q) > self.st["max_depth"]:
+                self.st["max_depth"] = len(self._q)
+            self._cv.notify_all()
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Warten, bis alle wartenden Frames gesendet sind."""
+        t_end = time.monotonic() + timeout
+        with self._cv:
+            while (self._q or self._busy) and not self._stopping:
+                left = t_end - time.monotonic()
+                if left <= 0:
+                    return False
+                self._cv.wait(left)
+        return True
+
+    def stop(self):
+        with self._cv:
+            self._stopping = True
+            self._cv.notify_all()
+
+    # --- Consumer ---
+    def run(self):
+        while True:
+            with self._cv:
+                while not self._q and not self._stopping:
+                    self._cv.wait()
+                if self._stopping:
+                    return
+                buf, profile, sync_at, t_in = self._q.popleft()
+                self._busy = True
+                self._cv.notify_all()
+            try:
+                self.send_fn(buf, profile, sync_at, t_in)
+                self.st["sent"] += 1
+            except Exception as e:
+                self.st["errors"] += 1
+                log.warning("frame send failed: %s", e)
+            finally:
+                with self._cv:
+                    self._busy = False
+                    self._free.append(buf)
+                    self._cv.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cv:
+            s = dict(self.st)
+            s["depth"] = len(self._q)
+        s["policy"] = self.policy
+        s["maxsize"] = self.maxsize
+        s["blocked_ms"] = round(s["blocked_ms"], 1)
+        return s
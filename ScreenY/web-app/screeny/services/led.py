@@ -1,7 +1,17 @@
-import socket, struct, time, logging
+import queue, re, socket, struct, threading, time, logging, zlib
+from concurrent.futures import ThreadPoolExecutor
 import cv2, numpy as np
 from typing import Optional, List, Dict, Any
 from ..config import BIND_IP, UDP_PORT, BROADCAST_IP, SCREEN_W, SCREEN_H
+from .udp_send import make_backend
+from .frame_sender import FrameSender
+from .pacing import FramePacer, PACING_STATS, wait_until
+from .resize import ResizeCache
+from .capture import PacketCapture
+from .decoder import ReadAheadDecoder, DECODE_STATS
+from .ffmpeg_pipe import open_capture
+from .stream_ingest import StreamIngest, STREAM_STATS
+from .telemetry import TELEMETRY
 
 log = logging.getLogger(__name__)
 
@@ -20,10 +30,6 @@ def hi_lo(v:int): return ((v>>8)&0xFF, v & 0xFF)
 def roundup32(n:int):
     size = ((n + 31) // 32) * 32
     return size if size <= FRAME_CHUNK else FRAME_CHUNK
-def _hex(b: bytes, n=64) -> str:
-    """Erste n Bytes als Hex (mit Leerzeichen)"""
-    return " ".join(f"{x:02X}" for x in b[:n])
-
 SYNC_PROFILES = {
     "still":      {"pre": 0.0010, "between": 0.040,  "offsets": (-1, 0, 1)},   # langsam, sicher
     "video3fast": {"pre": 0.0100, "between": 0.0002, "offsets": (-1, 0, 1)},   # dein Setting
@@ -31,17 +37,128 @@ SYNC_PROFILES = {
 }
 
 
+class FramePacketizer:
+    """
+    Vorbelegte FRAME-Pakete für eine Payload-Größe (ein Puffer pro Layout).
+    - Header (Typ, Paketindex, Gesamtzahl, size_field) werden einmal geschrieben
+    - pro Frame wird nur die fid gepatcht
+    - die Payload wird ohne Zwischenkopie direkt in die Paketpuffer kopiert
+    `packets` enthält memoryviews, die direkt an sendto() gehen können.
+    """
+    HDR_LEN = 10
+    SLOT = HDR_LEN + FRAME_CHUNK
+
+    def __init__(self, size:int, fmt:int=FMT_RGB888, last_units:bool=True):
+        self.fmt = fmt
+        self.last_units = last_units
+        self.size = -1
+        self.capacity = 0
+        self.total = 0
+        self.packets: List[memoryview] = []
+        self._buf = bytearray()
+        self._layout(size)
+
+    def _layout(self, size:int):
+        if size <= 0:
+            raise ValueError("payload size must be > 0")
+        full, rem = divmod(size, FRAME_CHUNK)
+        total = full + (1 if rem > 0 else 0)
+        if total > 0xFFFF:
+            raise ValueError(f"payload too large: {size} bytes")
+
+        if size > self.capacity:
+            # neuer Puffer -> alte memoryviews freigeben, Slots sind genullt.
+            # Variable Payloads (JPEG) bekommen Reserve, damit nicht jeder
+            # etwas größere Frame neu allokiert.
+            slots = total if self.fmt == FMT_RGB888 else total + max(2, total // 2)
+            self.packets = []
+            self._buf = bytearray(slots * self.SLOT)
+            self.capacity = slots * FRAME_CHUNK
+            self._arr = np.frombuffer(self._buf, dtype=np.uint8)
+
+        mv = memoryview(self._buf)
+        totH, totL = hi_lo(total)
+        packets = []
+        for idx in range(total):
+            last = (idx == total - 1)
+            part = (rem if rem > 0 else FRAME_CHUNK) if last else FRAME_CHUNK
+            padded = roundup32(part) if last else FRAME_CHUNK
+            size_field = max(1, min(45, (part + 31) // 32)) if (last and self.last_units) else 45
+            o = idx * self.SLOT
+            pkH, pkL = hi_lo(idx)
+            self._buf[o:o + self.HDR_LEN] = bytes([
+                HDR0, HDR1, MSG_FRAME, 0, self.fmt,
+                pkH, pkL, totH, totL, size_field
+            ])
+            packets.append(mv[o:o + self.HDR_LEN + padded])
+
+        self.size, self.total, self.packets = size, total, packets
+        self._full, self._rem = full, rem
+        # Sichten auf den Puffer: fid-Spalte und volle Payload-Zeilen
+        self._fid = self._arr[3::self.SLOT][:total]
+        self._rows = self._arr[:full * self.SLOT].reshape(full, self.SLOT)[:, self.HDR_LEN:]
+        self._tail = (full * self.SLOT + self.HDR_LEN) if rem else 0
+
+    def fill(self, fid:int, payload) -> List[memoryview]:
+        """Payload (bytes/bytearray/ndarray) in die Paketpuffer kopieren, fid patchen."""
+        src = np.frombuffer(payload, dtype=np.uint8) if not isinstance(payload, np.ndarray) \
+            else payload.reshape(-1)
+        n = src.size
+        if n != self.size:
+            self._layout(n)
+        full, rem = self._full, self._rem
+        if full:
+            self._rows[...] = src[:full * FRAME_CHUNK].reshape(full, FRAME_CHUNK)
+        if rem:
+            t = self._tail
+            self._arr[t:t + rem] = src[full * FRAME_CHUNK:]
+            pad_end = t + roundup32(rem)
+            if pad_end > t + rem:
+                self._arr[t + rem:pad_end] = 0
+        self._fid[...] = fid & 0xFF
+        return self.packets
+
+
 class LedBroadcaster:
     def __init__(self):
         self.addr = (BROADCAST_IP, UDP_PORT)
-        self._send_lock = None
         self.s = None
+        self.backend = None
+        self.transport = {"backend": "auto", "burst": 0, "burst_gap_us": 0,
+                          "format": "rgb", "jpeg_quality": 80, "budget_kbps": 0,
+                          "queue": "off", "queue_size": 2,
+                          "suppress_unchanged": True, "keepalive_s": 1.0,
+                          "dest": "broadcast"}
+        self.playback = {"readahead": 3, "decoder": "opencv",
+                         "stream_stall_s": 5.0, "stream_backoff_max_s": 30.0}
+        self._sender: Optional[FrameSender] = None
+        self.tx = {"frames": 0, "packets": 0, "syscalls": 0, "bytes": 0, "jpeg_frames": 0,
+                   "suppressed_frames": 0, "bytes_saved": 0, "keepalive_syncs": 0,
+                   "wire_bytes": 0}
+        self.frames_in = 0      # an send_frame() übergebene Frames (Player: hat ein Item gespielt?)
+        self._last_sig = None   # Signatur des zuletzt gesendeten Frames
+        self._t_last_tx = 0.0
+        self._fps_ema = 0.0
+        self._t_last_frame = 0.0
+        self._prep_ema = 0.0    # send_frame() -> Frame-Daten raus (s)
         self._open_socket()
         self.fid = 0
         self.modules: List[Dict[str, Any]] = []
         self.tiles: List[Dict[str, Any]] = []   # Layout-Tiles
         self.screen_w = SCREEN_W
         self.screen_h = SCREEN_H
+        self._packetizers: Dict[tuple, FramePacketizer] = {}
+        self._tx_lock = threading.Lock()    # ein Frame zur Zeit: Packetizer-Puffer sind geteilt
+        self.resizer = ResizeCache()
+        self._fanout = None          # (key, [(addr, pakete)]) für unicast
+        self._split = None           # [(addr, (x0, y0, x1, y1))] – Teil-Configs sind draußen
+        self._line_nums = (0, 32)
+        self._disc_lock = threading.Lock()
+        self._disc_thread: Optional[threading.Thread] = None
+        self._sync_addrs = [self.addr]
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.capture = PacketCapture()
+        self._frame_hook = None      # einmaliger Callback nach dem nächsten Frame
 
     # ------------------------------------------------
     # Socket & Send
@@ -60,13 +177,200 @@ class LedBroadcaster:
             self.s.bind((BIND_IP, 0))
             log.warning("UDP :%d busy, using OS port (%s)", UDP_PORT, e)
         self.s.settimeout(None)
+        self._make_backend()
+
+    def _make_backend(self):
+        t = self.transport
+        self.backend = make_backend(t.get("backend"), self.s,
+                                    burst=int(t.get("burst") or 0),
+                                    gap_s=float(t.get("burst_gap_us") or 0) / 1e6)
+        log.info("UDP send backend: %s (burst=%s, gap=%sus)",
+                 self.backend.name, t.get("burst"), t.get("burst_gap_us"))
+
+    def configure(self, tcfg: Optional[Dict[str, Any]]):
+        """Transport-Einstellungen aus config.json ("transport") übernehmen."""
+        if not tcfg:
+            return
+        self.transport.update({k: v for k, v in tcfg.items() if v is not None})
+        self._last_sig = None
+        self._fanout = None
+        self._make_backend()
+        self._make_sender()
+        self._push_split_config()
+
+    def configure_playback(self, pcfg: Optional[Dict[str, Any]]):
+        """Wiedergabe-Einstellungen aus config.json ("playback") übernehmen."""
+        if pcfg:
+            self.playback.update({k: v for k, v in pcfg.items() if v is not None})
+
+    def _make_sender(self):
+        """transport.queue: off | block | drop_oldest | latest"""
+        if self._sender:
+            self._sender.flush()
+            self._sender.stop()
+            self._sender = None
+        policy = (self.transport.get("queue") or "off").lower()
+        if policy in ("off", "sync", "none", ""):
+            return
+        self._sender = FrameSender(self._send_bgr, policy=policy,
+                                   maxsize=int(self.transport.get("queue_size") or 2))
+        self._sender.start()
+        log.info("async frame sender: policy=%s size=%d", self._sender.policy, self._sender.maxsize)
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Bei asynchronem Versand: warten, bis die Queue leer ist."""
+        return self._sender.flush(timeout) if self._sender else True
+
+    def set_destination(self, ip: str):
+        """Feste Ziel-IP statt Broadcast ("" oder 255.255.255.255 = Broadcast)."""
+        ip = (ip or "").strip() or BROADCAST_IP
+        self.addr = (ip, UDP_PORT)
+        self._sync_addrs = [self.addr]
+        self._fanout = None
+        self._last_sig = None   # neues Ziel hat das letzte Frame nie bekommen
+        log.info("LED destination: %s", ip)
 
     def send(self, b: bytes):
-        if not self._send_lock:
-            import threading
-            self._send_lock = threading.Lock()
-        with self._send_lock:
-            self.s.sendto(b, self.addr)
+        self.backend.send_one(b, self.addr)
+        if self.capture.enabled:
+            self.capture.record((b,), self.addr)
+
+    def send_burst(self, packets, tail=()) -> int:
+        """Paketliste (+ tail, z.B. SYNC) als Burst senden, liefert die Anzahl Syscalls."""
+        if self.capture.enabled:
+            self.capture.record(packets, self.addr, tail)
+        return self.backend.send_burst(packets, self.addr, tail)
+
+    def capture_start(self, packets: int = 4096):
+        """Paketmitschnitt (Ring) einschalten; Export über capture.to_pcap()."""
+        try:
+            src = self.s.getsockname()
+        except OSError:
+            src = None
+        self.capture.start(packets, src=src)
+        log.info("packet capture on (%d packets)", self.capture.size)
+
+    # ------------------------------------------------
+    # Unicast-Fan-out
+    # ------------------------------------------------
+    def _fanout_plan(self, fmt: int, packets: list):
+        """
+        transport.dest:
+        - broadcast: alles an self.addr (Default)
+        - unicast:   vollständiger Frame an jede per discover() bekannte Controller-IP
+        - split:     jeder Controller nur sein Rechteck (siehe _split_targets);
+                     das erledigt _send_payload, hier nur der Fallback
+        Liefert [(addr, pakete)] oder None (-> Broadcast).
+        """
+        mode = (self.transport.get("dest") or "broadcast").lower()
+        if mode != "unicast" or not self.modules:
+            return None
+        key = (mode, fmt, id(packets), len(packets), self.screen_w, self.screen_h)
+        if self._fanout and self._fanout[0] == key:
+            return self._fanout[1]
+
+        ip_of = {m.get("mac16"): m.get("ip") for m in self.modules if m.get("ip")}
+        wanted = {int(t["mac16"]) & 0xFFFF for t in self.tiles if "mac16" in t}
+        ips = list(dict.fromkeys(ip for mac16, ip in ip_of.items() if not wanted or mac16 in wanted))
+        if not ips:
+            return None
+
+        plan = [((ip, UDP_PORT), packets) for ip in ips]
+        self._fanout = (key, plan)
+        log.info("LED fan-out (%s): %s", mode, ", ".join(a[0] for a, _ in plan))
+        return plan
+
+    def _split_targets(self):
+        """
+        transport.dest=split: pro Controller-IP das 16px-Rechteck um seine
+        Tiles -> [(addr, (x0, y0, x1, y1), tiles)]. Jeder Controller bekommt
+        eine eigene Config (Wand = dieses Rechteck, Offsets relativ) und pro
+        Frame nur diese Pixel als eigenen Frame mit eigener Paketzählung und
+        eigenem SYNC – auf dem Draht steht so die Wand einmal, nicht
+        Controller × Wand. Tiles eines Controllers, die kein Rechteck bilden,
+        kosten den Verschnitt im Rechteck.
+        None, solange nicht jedes Tile einem bekannten Controller zugeordnet
+        ist (dann ganze Wand per Broadcast).
+        """
+        if (self.transport.get("dest") or "broadcast").lower() != "split" or not self.tiles:
+            return None
+        ip_of = {m.get("mac16"): m.get("ip") for m in self.modules if m.get("ip")}
+        by_ip: Dict[str, list] = {}
+        for t in self.tiles:
+            ip = ip_of.get(int(t.get("mac16", -1)) & 0xFFFF)
+            if ip is None:
+                return None
+            by_ip.setdefault(ip, []).append(t)
+        targets = []
+        for ip, tiles in by_ip.items():
+            x0 = min(int(t.get("offx", 0)) for t in tiles)
+            y0 = min(int(t.get("offy", 0)) for t in tiles)
+            x1 = min(self.screen_w, max(int(t.get("offx", 0)) + int(t.get("w", 128)) for t in tiles))
+            y1 = min(self.screen_h, max(int(t.get("offy", 0)) + int(t.get("h", 128)) for t in tiles))
+            if x1 <= x0 or y1 <= y0 or any(v % 16 for v in (x0, y0, x1, y1)):
+                log.warning("split: tiles of %s not on the 16px grid, sending full frames", ip)
+                return None
+            targets.append(((ip, UDP_PORT), (x0, y0, x1, y1), tiles))
+        return targets
+
+    def _push_split_config(self):
+        """
+        Split ein-/ausschalten: Teil-Configs unicast an die Controller bzw.
+        (zurück auf broadcast/unicast) die Config der ganzen Wand erneut senden.
+        """
+        targets = self._split_targets()
+        with self._tx_lock:
+            if targets:
+                for addr, (x0, y0, x1, y1), tiles in targets:
+                    rel = [dict(t, offx=int(t.get("offx", 0)) - x0, offy=int(t.get("offy", 0)) - y0)
+                           for t in tiles]
+                    for b in self._config_packets(rel, x1 - x0, y1 - y0):
+                        self.backend.send_one(b, addr)
+                self._split = [(addr, box) for addr, box, _ in targets]
+                log.info("LED split: %s", ", ".join(f"{a[0]}:{(x1 - x0)}x{(y1 - y0)}@{x0},{y0}"
+                                                     for a, (x0, y0, x1, y1) in self._split))
+            elif self._split is not None:
+                self._split = None
+                for b in self._config_packets(self.tiles, self.screen_w, self.screen_h):
+                    self.send(b)
+            self._last_sig = None
+
+    def _send_fanout(self, plan, tail=()) -> int:
+        """Ein Burst pro Ziel, mehrere Ziele parallel (sendmmsg/sendto geben die GIL frei)."""
+        if self.capture.enabled:
+            for addr, pkts in plan:
+                self.capture.record(pkts, addr, tail)
+        if len(plan) == 1:
+            addr, pkts = plan[0]
+            return self.backend.send_burst(pkts, addr, tail)
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="led-tx")
+        futs = [self._pool.submit(self.backend.send_burst, pkts, addr, tail) for addr, pkts in plan]
+        return sum(f.result() for f in futs)
+
+    def _send_sync_pkt(self, b: bytes):
+        for addr in self._sync_addrs:
+            self.backend.send_one(b, addr)
+            if self.capture.enabled:
+                self.capture.record((b,), addr)
+
+    def stats(self) -> Dict[str, Any]:
+        tx = dict(self.tx)
+        n = max(1, tx["frames"])
+        tx["backend"] = self.backend.name if self.backend else None
+        tx["packets_per_frame"] = round(tx["packets"] / n, 2)
+        tx["syscalls_per_frame"] = round(tx["syscalls"] / n, 2)
+        tx["bytes_per_frame"] = int(tx["bytes"] / n)
+        tx["format"] = self.transport.get("format")
+        tx["dest"] = self.transport.get("dest") or "broadcast"
+        tx["split"] = [{"ip": a[0], "box": list(box)} for a, box in (self._split or [])]
+        tx["fps"] = round(self._fps_ema, 2)
+        tx["queue"] = self._sender.stats() if self._sender else None
+        tx["prep_ms"] = round(self._prep_ema * 1000.0, 3)
+        tx["pacing"] = PACING_STATS.snapshot()
+        tx["decode"] = DECODE_STATS.snapshot()
+        tx["stream"] = STREAM_STATS.snapshot()
+        return tx
 
     # ------------------------------------------------
     # Discover / Registry
@@ -74,20 +378,46 @@ class LedBroadcaster:
     def registry_request(self):
         self.send(bytes([HDR0, HDR1, MSG_REG_REQ, 0, 0]))
 
+    def _discovery_socket(self) -> socket.socket:
+        """
+        Eigener Empfangs-Socket auf UDP_PORT (REGISTER kommt per Broadcast an
+        alle Sockets des Ports). Der Sende-Socket von Player/FrameSender
+        bleibt unangetastet (kein settimeout, kein recvfrom).
+        """
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if hasattr(socket, "SO_REUSEPORT"):
+                try: s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+                except OSError: pass
+            s.bind((BIND_IP, UDP_PORT))
+            s.settimeout(0.2)
+        except OSError:
+            s.close()
+            raise
+        return s
+
     def discover(self, seconds: float = 2.0):
-        self.modules.clear()
+        """REGISTRY-Anfrage senden und seconds lang REGISTER-Antworten sammeln."""
+        try:
+            s = self._discovery_socket()
+        except OSError as e:
+            log.warning("discover: cannot bind :%d (%s)", UDP_PORT, e)
+            return self.modules
+        found: List[Dict[str, Any]] = []
         t_end = time.time() + seconds
-        self.s.settimeout(0.2)
         try:
+            s.sendto(bytes([HDR0, HDR1, MSG_REG_REQ, 0, 0]), self.addr)
             while time.time() < t_end:
                 try:
-                    data, addr = self.s.recvfrom(2048)
+                    data, addr = s.recvfrom(2048)
                 except socket.timeout:
                     continue
                 if len(data) < 7 or data[0] != HDR0 or data[1] != HDR1 or data[2] != MSG_REGISTER:
                     continue
                 mac32 = (data[3]<<24)|(data[4]<<16)|(data[5]<<8)|data[6]
-                if any(m.get("mac32")==mac32 for m in self.modules):
+                if any(m.get("mac32")==mac32 for m in found):
                     continue
                 m = {
                     "mac32": mac32,
@@ -97,11 +427,26 @@ class LedBroadcaster:
                     "width": (data[11]*16 if len(data)>=13 else None),
                     "height": (data[12]*16 if len(data)>=13 else None),
                 }
-                self.modules.append(m)
+                found.append(m)
         finally:
-            self.s.settimeout(None)
+            s.close()
+        self.modules = found        # in einem Schritt (Player liest parallel)
+        self._fanout = None
+        self._last_sig = None       # ggf. neue Controller -> nächsten Frame ganz senden
+        self._push_split_config()
         return self.modules
 
+    def discover_async(self, seconds: float = 1.0):
+        """discover() im Hintergrund, höchstens einmal gleichzeitig; bis dahin Broadcast."""
+        with self._disc_lock:
+            if self._disc_thread is not None and self._disc_thread.is_alive():
+                return
+            def run():
+                mods = self.discover(seconds)
+                log.info("discover: %d controller(s) found", len(mods))
+            self._disc_thread = threading.Thread(target=run, daemon=True, name="led-discover")
+            self._disc_thread.start()
+
     # ------------------------------------------------
     # Config & Layout
     # ------------------------------------------------
@@ -115,34 +460,45 @@ class LedBroadcaster:
         #ordered = sorted(tiles, key=_key)
         ordered = sorted(tiles, key=lambda t: (int(t.get("offy",0)),
                                     int(t.get("offx",0))))
+        # Größe je Tile festhalten (Split-/Neu-Configs kennen panel_w/h nicht mehr)
+        ordered = [dict(t, w=int(t.get("w", panel_w)), h=int(t.get("h", panel_h))) for t in ordered]
 
-        totW16, totH16 = (total_w // 16) & 0xFF, (total_h // 16) & 0xFF
+        for b in self._config_packets(ordered, total_w, total_h, line_nums):
+            self.send(b)
+        self.send_gamma_identity()
+        self.send(bytes([HDR0, HDR1, MSG_STATE, 1, 100]))
 
-        for ln in line_nums:  # wie Original: 0 und 32
+        self.screen_w, self.screen_h = total_w, total_h
+        self.tiles = ordered
+        self._line_nums = tuple(line_nums)
+        self._last_sig = None   # Panels evtl. neu gestartet -> nächsten Frame sicher senden
+        self._fanout = None
+        self._split = None      # eben ging die Config der ganzen Wand raus
+        self._push_split_config()
+
+    def _config_packets(self, tiles:list, total_w:int, total_h:int, line_nums=None) -> List[bytes]:
+        """CONFIG-Pakete (je line_num eins): Wandgröße + Tiles (mac16, Größe, Offset in 16px)."""
+        totW16, totH16 = (total_w // 16) & 0xFF, (total_h // 16) & 0xFF
+        out = []
+        for ln in (line_nums or self._line_nums):  # wie Original: 0 und 32
             payload = bytearray([HDR0, HDR1, MSG_CONFIG, 2,
-                                ln & 0xFF, totW16, totH16, len(ordered) & 0xFF])
-            
-            for idx, t in enumerate(ordered, start=1):
+                                ln & 0xFF, totW16, totH16, len(tiles) & 0xFF])
+            for t in tiles:
                 mac16 = int(t["mac16"]) & 0xFFFF
-                w  = int(t.get("w",  panel_w))
-                h  = int(t.get("h",  panel_h))
+                w  = int(t.get("w",  128))
+                h  = int(t.get("h",  128))
                 ox = int(t.get("offx", 0))
                 oy = int(t.get("offy", 0))
                 payload += bytes([
                     (mac16 >> 8) & 0xFF, mac16 & 0xFF,
-                    1, 
+                    1,
                     (w  // 16) & 0xFF,
                     (h  // 16) & 0xFF,
-                    (ox // 16) & 0xFF, 
+                    (ox // 16) & 0xFF,
                     (oy // 16) & 0xFF
                 ])
-
-            self.send(payload)
-        self.send_gamma_identity()
-        self.send(bytes([HDR0, HDR1, MSG_STATE, 1, 100]))
-
-        self.screen_w, self.screen_h = total_w, total_h
-        self.tiles = ordered
+            out.append(bytes(payload))
+        return out
 
     def send_gamma_identity(self):
         lut = bytes(range(256))
@@ -167,105 +523,211 @@ class LedBroadcaster:
     def image_to_blob(self, img_bgr: np.ndarray) -> bytes:
         import numpy as np
         return np.ascontiguousarray(img_bgr).tobytes()
-    def send_frame(self, frame_bgr: np.ndarray, sync_profile="still", mode="fit"): 
+    def send_frame(self, frame_bgr: np.ndarray, sync_profile="still", mode="fit", sync_at=None):
         """Sende ein Frame über alle Panels.
         mode = "fill" -> strecken auf volle Fläche (Seitenverhältnis kann verzerren)
         mode = "fit"  -> Bild vollständig zeigen, schwarze Ränder falls nötig
+        sync_at = perf_counter()-Deadline für den SYNC (siehe FramePacer)
         """
-        H, W = frame_bgr.shape[:2]
-        target_w, target_h = self.screen_w, self.screen_h
-
-        if (W, H) != (target_w, target_h):
-            if mode == "fit":
-                # Skalieren mit Erhalt des Seitenverhältnisses
-                scale = min(target_w / W, target_h / H)
-                new_w, new_h = int(W * scale), int(H * scale)
-                resized = cv2.resize(frame_bgr, (new_w, new_h),
-                                     interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
-
-                # In schwarze Fläche zentrieren
-                canvas = np.zeros((target_h, target_w, 3), dtype=np.uint8)
-                x0 = (target_w - new_w) // 2
-                y0 = (target_h - new_h) // 2
-                canvas[y0:y0+new_h, x0:x0+new_w] = resized
-                frame_bgr = canvas
-
-            else:  # "fill" oder default
-                scale = max(target_w / W, target_h / H)
-                new_w, new_h = int(W * scale), int(H * scale)
-                resized = cv2.resize(frame_bgr, (new_w, new_h),
-                                    interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
-                x0 = max(0, (new_w - target_w) // 2)
-                y0 = max(0, (new_h - target_h) // 2)
-                frame_bgr = resized[y0:y0+target_h, x0:x0+target_w]
-
-        blob = self.image_to_blob(frame_bgr)
-        self.frame_bgr_blob(blob, last_units=True, sync_profile=sync_profile)
-
-
-    def frame_bgr_blob(self, blob: bytes, *, last_units=True, sync_profile: str = "video1"):
-        import logging
-        log = logging.getLogger(__name__)
-
+        t_in = time.perf_counter()
+        src = frame_bgr
+        frame_bgr = self.resizer.resize(frame_bgr, self.screen_w, self.screen_h, mode)
+        if frame_bgr is not src:
+            TELEMETRY.add("scale", time.perf_counter() - t_in)
+        TELEMETRY.frame()
+        self.frames_in += 1
+
+        if self._sender:
+            self._sender.submit(frame_bgr, sync_profile, sync_at, t_in)
+        else:
+            self._send_bgr(frame_bgr, sync_profile, sync_at, t_in)
+        if self._frame_hook is not None:
+            hook, self._frame_hook = self._frame_hook, None
+            hook(t_in)
+
+    def on_next_frame(self, cb):
+        """cb(t_in) einmalig nach dem nächsten send_frame() aufrufen (Latenzmessung);
+        t_in = perf_counter() bei Übergabe des Frames, ohne Versand und SYNC."""
+        self._frame_hook = cb
+
+    def _unchanged(self, frame_bgr: np.ndarray) -> bool:
+        """
+        True, wenn das Frame byte-gleich zum zuletzt gesendeten ist (CRC32 über
+        das fertige Frame). Dann geht höchstens alle keepalive_s ein SYNC raus.
+        """
+        if not self.transport.get("suppress_unchanged", True):
+            self._last_sig = None
+            return False
+        sig = (frame_bgr.shape, zlib.crc32(frame_bgr))
+        now = time.perf_counter()
+        if sig != self._last_sig:
+            self._last_sig = sig
+            self._t_last_tx = now
+            return False
+        tx = self.tx
+        tx["suppressed_frames"] += 1
+        tx["bytes_saved"] += frame_bgr.nbytes
+        keepalive = float(self.transport.get("keepalive_s") or 0)
+        if keepalive > 0 and now - self._t_last_tx >= keepalive:
+            self._send_sync_pkt(bytes([HDR0, HDR1, MSG_SYNC, self.fid & 0xFF]))
+            tx["keepalive_syncs"] += 1
+            self._t_last_tx = now
+        return True
+
+    def sync_lead(self, sync_profile: str) -> float:
+        """Vorlauf vor der Deadline: Aufbereitung/Versand + 'pre' des Sync-Profils."""
+        p = SYNC_PROFILES.get(sync_profile, SYNC_PROFILES["video1"])
+        return p["pre"] + self._prep_ema
+
+    def _send_bgr(self, frame_bgr: np.ndarray, sync_profile: str, sync_at=None, t_in=None):
+        """Wandgroßes BGR-Frame kodieren (RGB/JPEG) und senden."""
+        frame_bgr = np.ascontiguousarray(frame_bgr)
+        if self._unchanged(frame_bgr):
+            return
+        if self._use_jpeg(frame_bgr.nbytes):
+            q = int(self.transport.get("jpeg_quality") or 80)
+            t0 = time.perf_counter()
+            ok, buf = cv2.imencode(".jpg", frame_bgr, [int(cv2.IMWRITE_JPEG_QUALITY), max(10, min(100, q))])
+            TELEMETRY.add("encode", time.perf_counter() - t0)
+            if ok:
+                self.frame_jpeg(buf, sync_profile=sync_profile, sync_at=sync_at, t_in=t_in)
+                return
+            log.warning("jpeg encode failed, sending RGB")
+        self.frame_bgr_blob(frame_bgr, last_units=True, sync_profile=sync_profile, sync_at=sync_at, t_in=t_in)
+
+    def _use_jpeg(self, rgb_bytes:int) -> bool:
+        """
+        transport.format: rgb | jpeg | auto
+        auto -> JPEG, sobald RGB bei aktueller Framerate das Budget (kbit/s) sprengt.
+        """
+        now = time.perf_counter()
+        dt = now - self._t_last_frame
+        self._t_last_frame = now
+        if 0 < dt < 2.0:
+            fps = 1.0 / dt
+            self._fps_ema = fps if self._fps_ema <= 0 else (0.9 * self._fps_ema + 0.1 * fps)
+        else:
+            self._fps_ema = 0.0
+
+        if self._split:
+            return False        # Teil-Frames pro Controller gibt es nur als RGB
+        fmt = (self.transport.get("format") or "rgb").lower()
+        if fmt == "jpeg":
+            return True
+        if fmt != "auto":
+            return False
+        budget = float(self.transport.get("budget_kbps") or 0)
+        if budget <= 0:
+            return False
+        return rgb_bytes * 8 * max(1.0, self._fps_ema) / 1000.0 > budget
+
+
+    def _packetizer(self, fmt:int, size:int, last_units:bool, addr=None) -> FramePacketizer:
+        key = (fmt, last_units, addr)
+        pk = self._packetizers.get(key)
+        if pk is None:
+            pk = FramePacketizer(size, fmt=fmt, last_units=last_units)
+            self._packetizers[key] = pk
+        return pk
+
+    def frame_bgr_blob(self, blob, *, last_units=True, sync_profile: str = "video1", sync_at=None, t_in=None):
+        """Blob (bytes oder zusammenhängendes BGR-Array) paketieren und senden."""
+        size = blob.nbytes if isinstance(blob, np.ndarray) else len(blob)
         expected = self.screen_w * self.screen_h * 3
-        assert len(blob) == expected, f"blob size mismatch: {len(blob)} != {expected}"
-
-        self.fid = (self.fid + 1) & 0xFF
-        fid = self.fid
-        size = len(blob)
-
-        full = size // FRAME_CHUNK
-        rem  = size - full * FRAME_CHUNK
-        total = full + (1 if rem > 0 else 0)
-        totH, totL = hi_lo(total)
-
-        off = 0
-        for idx in range(total):
-            last = (idx == total - 1)
-            if last:
-                part = rem if rem > 0 else FRAME_CHUNK
-                padded = roundup32(part)
+        assert size == expected, f"blob size mismatch: {size} != {expected}"
+        self._send_payload(FMT_RGB888, blob, size, last_units=last_units,
+                           sync_profile=sync_profile, sync_at=sync_at, t_in=t_in)
+
+    def frame_jpeg(self, jpeg, *, sync_profile: str = "video1", sync_at=None, t_in=None):
+        """Fertig kodiertes JPEG (ganze Wand) als FMT_JPEG-Frame senden."""
+        size = jpeg.nbytes if isinstance(jpeg, np.ndarray) else len(jpeg)
+        self._send_payload(FMT_JPEG, jpeg, size, last_units=True,
+                           sync_profile=sync_profile, sync_at=sync_at, t_in=t_in)
+        self.tx["jpeg_frames"] += 1
+
+    def _send_payload(self, fmt:int, payload, size:int, *, last_units=True, sync_profile="video1",
+                      sync_at=None, t_in=None):
+        """
+        Unter _tx_lock: Player-Thread, FrameSender und die async Routen
+        (/api/panels/test, /image, send_config) teilen sich fid und die
+        Paketpuffer der Packetizer – ohne Lock überschreiben sich zwei Frames
+        gegenseitig Header und Nutzdaten.
+        """
+        with self._tx_lock:
+            self.fid = (self.fid + 1) & 0xFF
+            fid = self.fid
+
+            t0 = time.perf_counter()
+            split = self._split if fmt == FMT_RGB888 else None
+            if split:
+                # jeder Controller sein Rechteck als eigener Frame (eigene Paketzählung)
+                img = (payload if isinstance(payload, np.ndarray)
+                       else np.frombuffer(payload, dtype=np.uint8)).reshape(self.screen_h, self.screen_w, 3)
+                plan = []
+                for addr, (x0, y0, x1, y1) in split:
+                    part = np.ascontiguousarray(img[y0:y1, x0:x1])
+                    pk = self._packetizer(fmt, part.nbytes, last_units, addr)
+                    plan.append((addr, pk.fill(fid, part)))
             else:
-                part = FRAME_CHUNK
-                padded = FRAME_CHUNK
-
-            chunk = bytearray(padded)
-            chunk[:part] = blob[off:off + part]
-            off += part
-
-            pkH, pkL = hi_lo(idx)
-            size_field = max(1, min(45, (part + 31) // 32)) if (last and last_units) else 45
-
-            hdr = bytes([
-                HDR0, HDR1, MSG_FRAME, fid, FMT_RGB888,
-                pkH, pkL, totH, totL, size_field
-            ])
-            log.debug("[DUMP] FRAME0 HDR %s", _hex(hdr, 10))
-            log.debug("[DUMP] FRAME0 PAY %s", _hex(chunk, 64))
-            self.send(hdr + chunk)
-
-            log.debug(
-                f"frame {fid:02d} chunk {idx+1}/{total} "
-                f"part={part} padded={padded} "
-                f"size_field={size_field} off={off}/{size}"
-            )
-
-        if off != size:
-            log.warning(
-                f"frame {fid:02d} size mismatch after split: sent={off} expected={size}"
-            )
-
-        self._send_sync(fid, profile=sync_profile)
-        log.debug(f"frame {fid:02d} sync sent ({sync_profile}), total={size} bytes")
-
-
-    def _send_sync(self, fid:int, profile:str="video1"):
+                pk = self._packetizer(fmt, size, last_units)
+                packets = pk.fill(fid, payload)
+                plan = self._fanout_plan(fmt, packets) or [(self.addr, packets)]
+            self._sync_addrs = [a for a, _ in plan]
+            p = SYNC_PROFILES.get(sync_profile, SYNC_PROFILES["video1"])
+            n_sync = len(p["offsets"])
+            t1 = time.perf_counter()
+            TELEMETRY.add("packetize", t1 - t0)
+            if p["pre"] <= 0 and p["between"] <= 0:
+                # SYNC ohne Wartezeiten -> im selben Burst wie die Frame-Pakete
+                if sync_at is not None:
+                    PACING_STATS.get("sync", 0).add(wait_until(sync_at))
+                    t2 = time.perf_counter()
+                    TELEMETRY.add("sync", t2 - t1)
+                    t1 = t2
+                syncs = [bytes([HDR0, HDR1, MSG_SYNC, (fid + o) & 0xFF]) for o in p["offsets"]]
+                calls = self._send_fanout(plan, syncs)
+                self._note_prep(t_in)
+                TELEMETRY.add("send", time.perf_counter() - t1)
+            else:
+                calls = self._send_fanout(plan)
+                self._note_prep(t_in)
+                t2 = time.perf_counter()
+                TELEMETRY.add("send", t2 - t1)
+                self._send_sync(fid, profile=sync_profile, sync_at=sync_at)
+                TELEMETRY.add("sync", time.perf_counter() - t2)
+                calls += n_sync * len(plan)
+
+            tx = self.tx
+            tx["frames"] += 1
+            tx["packets"] += sum(len(pk) for _, pk in plan) + n_sync * len(plan)
+            tx["syscalls"] += calls
+            tx["bytes"] += size
+            tx["wire_bytes"] += sum(len(b) for _, pk in plan for b in pk)
+            log.debug("frame %02d sent (fmt=%d, %s), total=%d bytes, %d syscalls",
+                      fid, fmt, sync_profile, size, calls)
+
+
+    def _note_prep(self, t_in):
+        if t_in is not None:
+            dt = time.perf_counter() - t_in
+            self._prep_ema = dt if self._prep_ema <= 0 else (0.8 * self._prep_ema + 0.2 * dt)
+
+    def _send_sync(self, fid:int, profile:str="video1", sync_at=None):
+        """
+        SYNC nach dem 'pre'-Abstand senden – mit sync_at frühestens zur
+        Frame-Deadline, damit die Wartezeit nicht zusätzlich ins Frame-Budget fällt.
+        """
         p = SYNC_PROFILES.get(profile, SYNC_PROFILES["video1"])
-        if p["pre"] > 0: time.sleep(p["pre"])
+        t_first = time.perf_counter() + p["pre"]
+        if sync_at is not None:
+            t_first = max(t_first, sync_at)
+        late = wait_until(t_first)
+        if sync_at is not None:
+            PACING_STATS.get("sync", 0).add(late + (t_first - sync_at))
         for i, off in enumerate(p["offsets"]):
-            self.send(bytes([HDR0,HDR1,MSG_SYNC, (fid+off)&0xFF]))
+            self._send_sync_pkt(bytes([HDR0,HDR1,MSG_SYNC, (fid+off)&0xFF]))
             if i < len(p["offsets"]) - 1 and p["between"] > 0:
-                time.sleep(p["between"])
+                wait_until(time.perf_counter() + p["between"])
 
     # ------------------------------------------------
     # High-level helpers
@@ -298,49 +760,187 @@ class LedBroadcaster:
             cv2.putText(img,timestr,(x+8,y+60),cv2.FONT_HERSHEY_SIMPLEX,0.4,(255,255,255),1,cv2.LINE_AA)
         self.send_frame(img, sync_profile="still")
 
+    def open_capture(self, src:str, mode="fill", fps=None, stream=False):
+        """Capture nach playback.decoder (opencv / ffmpeg-Pipe in Wandgröße)."""
+        return open_capture(self.playback.get("decoder"), src, self.screen_w, self.screen_h,
+                            mode=mode, fps=fps, stream=stream)
+
     def play_video(self, path:str, fps_limit=None, mode="fill",
-                sync_profile="video3fast", loop=False, should_abort=None):
-        cap = cv2.VideoCapture(path)
+                sync_profile="video3fast", loop=False, should_abort=None, cap=None, first=None,
+                wake=None, record=None):
+        """
+        cap/first: bereits geöffnete Capture + erster Frame (Preloader).
+        wake: Event, das Wartezeiten sofort beendet (Abbruch durch den Player).
+        record: ClipRecorder des FrameCache – schreibt die dekodierten Frames
+        mit; übernommen wird nur ein lückenloser Durchlauf bis zum Ende.
+        Dekodiert und skaliert wird vorab im ReadAheadDecoder; hinkt der
+        Versand hinterher, springt der Decoder zum Frame, der laut Uhr dran
+        ist – die Laufzeit bleibt auch unter Last gleich.
+        """
+        if cap is None:
+            cap = self.open_capture(path, mode, fps=fps_limit)
         if not cap.isOpened():
+            cap.release()
+            if record is not None: record.abort()
             return
         src_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
         tgt = src_fps if fps_limit is None else min(fps_limit, src_fps)
-        period = 1.0/max(1e-6, tgt)
-        t_next = time.perf_counter()
+        if record is not None and (loop or not record.start(tgt)):
+            record.abort()
+            record = None
+        ended = False
+        dec = ReadAheadDecoder(cap, self.screen_w, self.screen_h, mode,
+                               ratio=src_fps / max(1e-6, tgt),   # Quell-Frames pro gesendetem Frame
+                               depth=int(self.playback.get("readahead") or 3),
+                               first=first, loop=loop)
+        pacer = FramePacer(tgt, kind="video", drop_late=True, should_abort=should_abort, wake=wake)
         try:
             while True:
                 if should_abort and should_abort(): break
-                ok, frame = cap.read()
+                try:
+                    item = dec.get()
+                except queue.Empty:
+                    continue
+                if item is None:
+                    ended = not dec.failed
+                    break
+                k, frame = item
+                if record is not None and not record.add(k, frame):
+                    record = None
+                if k > pacer.index:
+                    pacer.skip(k - pacer.index)     # vom Decoder übersprungen
+                # zu spät: verwerfen, wenn schon ein neuerer Frame bereitliegt –
+                # ist der Decoder selbst der Engpass, lieber verspätet zeigen
+                pacer.drop_late = dec.pending() > 0
+                ok = pacer.wait_frame(lead=min(pacer.period, self.sync_lead(sync_profile)))
+                if ok is None:                      # Abbruch/Befehl -> nichts mehr senden
+                    dec.release(frame)
+                    break
                 if not ok:
-                    if loop: cap.set(cv2.CAP_PROP_POS_FRAMES,0); continue
+                    DECODE_STATS.add("dropped")
+                    dec.release(frame)
+                    dec.seek(pacer.index + pacer.frames_behind())
+                    continue
+                dec.seek(pacer.index)               # Ticks übersprungen -> Decoder nachziehen
+                self.send_frame(frame, mode=mode, sync_profile=sync_profile, sync_at=pacer.deadline)
+                dec.release(frame)
+        finally:
+            pacer.close()
+            dec.close()         # gibt auch cap frei (im Decoder-Thread)
+            if record is not None:
+                record.finish() if ended else record.abort()
+
+    def play_frames(self, frames, fps:float, mode="fill", sync_profile="video3fast", should_abort=None,
+                    wake=None):
+        """
+        Fertige Frames in Wandgröße senden (z.B. memmap aus dem FrameCache).
+        Kein Decoder: hinkt der Versand hinterher, wird direkt der Frame
+        gesendet, der laut Uhr dran ist – die Laufzeit bleibt gleich.
+        """
+        n = len(frames)
+        pacer = FramePacer(fps, kind="cached", drop_late=False, should_abort=should_abort, wake=wake)
+        try:
+            while True:
+                if should_abort and should_abort(): break
+                if pacer.wait_frame(lead=min(pacer.period, self.sync_lead(sync_profile))) is None:
                     break
-                self.send_frame(frame, mode=mode, sync_profile=sync_profile)
-                t_next += period
-                delay = t_next - time.perf_counter()
-                if delay>0: time.sleep(delay)
-                else: t_next = time.perf_counter()
+                k = pacer.index - 1
+                if k >= n: break
+                self.send_frame(frames[k], mode=mode, sync_profile=sync_profile, sync_at=pacer.deadline)
         finally:
-            cap.release()
+            pacer.close()
+
+    def play_animation(self, frames, delays, seconds:float, mode="fill", sync_profile="video3fast",
+                       should_abort=None, wake=None):
+        """
+        Fertige Frames mit eigener Anzeigedauer je Frame (GIF/WebP) für
+        `seconds` in Schleife senden. Deadlines sind absolut (Summe der
+        Delays); ist ein Frame schon vorbei, bevor er dran war, fällt er weg.
+        """
+        n = len(frames)
+        starts = np.concatenate(([0.0], np.cumsum(delays)))   # starts[n] = Zykluslänge
+        cycle = float(starts[-1])
+        if n == 0 or cycle <= 0:
+            return
+        lead = self.sync_lead(sync_profile)
+        hist = PACING_STATS.get("animation", 0)
+        TELEMETRY.target(n / cycle)
+        t0 = time.perf_counter()
+        t_end = t0 + seconds
+        c, k = 0, 0
+        while True:
+            if should_abort and should_abort(): break
+            deadline = t0 + c * cycle + starts[k]
+            if deadline >= t_end: break
+            t_next = t0 + c * cycle + starts[k + 1]
+            if time.perf_counter() >= t_next:
+                hist.dropped += 1
+                TELEMETRY.drop()
+            else:
+                late = wait_until(deadline - min(lead, float(delays[k])),
+                                  should_abort=should_abort, wake=wake)
+                if late is None:
+                    break
+                hist.add(late)
+                self.send_frame(frames[k], mode=mode, sync_profile=sync_profile, sync_at=deadline)
+            k += 1
+            if k >= n:
+                k, c = 0, c + 1
+        # letzter Frame bleibt bis zum Ende stehen
+        wait_until(t_end, should_abort=should_abort, wake=wake)
 
     def play_stream(self, source:str, fps_limit:float|None=25.0, mode="fill",
-                    sync_profile="video3fast", should_abort=None, max_seconds=None):
-        cap = cv2.VideoCapture(source, cv2.CAP_ANY)
-        if not cap.isOpened(): return
-        try: cap.set(cv2.CAP_PROP_BUFFERSIZE, 2)
-        except: pass
-        src_fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+                    sync_profile="video3fast", should_abort=None, max_seconds=None, cap=None,
+                    wake=None):
+        """
+        Live-Quelle: gelesen wird im StreamIngest-Thread, der nur den neuesten
+        Frame hält und bei Abbrüchen/Hängern neu verbindet. Pro Takt geht der
+        jeweils neueste Frame raus, es staut sich keine Latenz auf.
+        Schlägt schon das erste Öffnen fehl, versucht es StreamIngest mit
+        Backoff weiter; kam nach stream_backoff_max_s noch kein Frame, endet
+        das Item (die Playlist läuft weiter).
+        """
+        def _open():
+            return self.open_capture(source, mode, fps=min(fps_limit or 25.0, 25.0), stream=True)
+        if cap is None:
+            try:
+                cap = _open()
+            except Exception as e:
+                log.debug("stream open failed: %s", e)
+                cap = None
+        src_fps = 0.0
+        if cap is not None and cap.isOpened():
+            try: cap.set(cv2.CAP_PROP_BUFFERSIZE, 2)
+            except: pass
+            src_fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        elif cap is not None:
+            cap.release()
+            cap = None          # neu verbinden übernimmt StreamIngest (mit Backoff)
         tgt_fps = min(fps_limit or (src_fps if src_fps>0 else 25.0), 25.0)
-        period = 1.0/max(1e-6,tgt_fps)
-        t_next = time.perf_counter()
-        t0 = t_next
-        while True:
-            if (should_abort and should_abort()): break
-            if max_seconds and (time.perf_counter()-t0)>=max_seconds: break
-            ok, frame = cap.read()
-            if not ok: time.sleep(0.05); continue
-            self.send_frame(frame, mode=mode, sync_profile=sync_profile)
-            t_next += period
-            delay = t_next - time.perf_counter()
-            if delay>0: time.sleep(delay)
-            else: t_next = time.perf_counter()
-        cap.release()
+        pb = self.playback
+        backoff_max = float(pb.get("stream_backoff_max_s") or 30.0)
+        ing = StreamIngest(_open, cap=cap, name=re.sub(r"//[^/@]*@", "//", source),
+                           stall_s=float(pb.get("stream_stall_s") or 5.0),
+                           backoff_max_s=backoff_max).start()
+        # verpasste Ticks überspringen, aber immer den neuesten Frame senden
+        pacer = FramePacer(tgt_fps, kind="stream", drop_late=False, should_abort=should_abort, wake=wake)
+        t0 = time.perf_counter()
+        seq = 0
+        try:
+            while True:
+                if (should_abort and should_abort()): break
+                if max_seconds and (time.perf_counter()-t0)>=max_seconds: break
+                if not seq and time.perf_counter() - t0 >= backoff_max:
+                    log.info("stream %s: no frame after %.0fs, skipping", ing.name, backoff_max)
+                    break
+                if pacer.wait_frame(lead=min(pacer.period, self.sync_lead(sync_profile))) is None:
+                    break
+                item = ing.latest()
+                if item is None or item[0] == seq:
+                    continue        # seit dem letzten Takt nichts Neues
+                seq, frame, t_cap = item
+                self.send_frame(frame, mode=mode, sync_profile=sync_profile, sync_at=pacer.deadline)
+                STREAM_STATS.sent(time.perf_counter() - t_cap)
+        finally:
+            pacer.close()
+            ing.close()
@@ -0,0 +1,151 @@
+import asyncio, logging, threading, time
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, Optional
+
+log = logging.getLogger(__name__)
+
+
+class MjpegProducer:
+    """
+    Ein Render+Encode-Thread pro Quelle. Fertige JPEGs landen in einem
+    kleinen Ring (seq, bytes); Abonnenten werden über ihren Event-Loop
+    geweckt und holen sich immer das neueste Frame – wer zu langsam ist,
+    überspringt Frames statt einen Rückstau aufzubauen.
+
+    factory() läuft im Producer-Thread und liefert next_frame() -> JPEG-Bytes.
+    """
+    RING = 4
+
+    def __init__(self, key: Hashable, factory: Callable[[], Callable[[], bytes]], fps: float = 20.0):
+        self.key = key
+        self.factory = factory
+        self.period = 1.0 / max(1.0, float(fps))
+        self._lock = threading.Lock()
+        self._ring: "deque[tuple]" = deque(maxlen=self.RING)
+        self._seq = 0
+        self._subs = set()          # (loop, asyncio.Event)
+        self._stopping = threading.Event()
+        self.stopped = False
+        self.st = {"frames": 0, "encode_ms": 0.0, "skipped": 0}
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True, name="mjpeg-producer").start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+
+    def latest(self) -> Optional[tuple]:
+        with self._lock:
+            return self._ring[-1] if self._ring else None
+
+    def subscribers(self) -> int:
+        with self._lock:
+            return len(self._subs)
+
+    def _wake_all(self):
+        with self._lock:
+            subs = list(self._subs)
+        for loop, ev in subs:
+            try:
+                loop.call_soon_threadsafe(ev.set)
+            except RuntimeError:
+                pass                # Loop schon zu
+
+    def _run(self):
+        try:
+            next_frame = self.factory()
+            t_next = time.perf_counter()
+            while not self._stopping.is_set():
+                t0 = time.perf_counter()
+                data = next_frame()
+                dt = time.perf_counter() - t0
+                with self._lock:
+                    self._seq += 1
+                    self._ring.append((self._seq, data))
+                self.st["frames"] += 1
+                self.st["encode_ms"] = round(dt * 1000.0 if self.st["frames"] == 1
+                                             else self.st["encode_ms"] * 0.9 + dt * 100.0, 2)
+                self._wake_all()
+                t_next += self.period
+                now = time.perf_counter()
+                if t_next < now - self.period:
+                    t_next = now    # hinterher (z.B. Encode zu langsam) -> nicht nachholen
+                self._stopping.wait(max(0.0, t_next - now))
+        except Exception as e:
+            log.warning("mjpeg producer %s failed: %s", self.key, e)
+        finally:
+            self.stopped = True
+            self._wake_all()
+
+
+class MjpegHub:
+    """
+    Ein gemeinsamer Producer pro Schlüssel (z.B. Token + Wandgröße), beliebig
+    viele Zuschauer. Der Producer startet mit dem ersten Abonnenten und endet
+    mit dem letzten.
+
+        async for jpeg in MJPEG_HUB.frames(key, factory):
+            yield part(jpeg)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._producers: Dict[Hashable, MjpegProducer] = {}
+        self.st = {"producers_started": 0, "subscribes": 0}
+
+    def _subscribe(self, key, factory, fps):
+        sub = (asyncio.get_running_loop(), asyncio.Event())
+        start = False
+        with self._lock:
+            p = self._producers.get(key)
+            if p is None or p.stopped:
+                p = self._producers[key] = MjpegProducer(key, factory, fps)
+                self.st["producers_started"] += 1
+                start = True
+            with p._lock:
+                p._subs.add(sub)
+            self.st["subscribes"] += 1
+        if start:
+            p.start()
+        return p, sub
+
+    def _unsubscribe(self, p: MjpegProducer, sub):
+        with self._lock:
+            with p._lock:
+                p._subs.discard(sub)
+                last = not p._subs
+            if last:
+                p.stop()
+                if self._producers.get(p.key) is p:
+                    del self._producers[p.key]
+
+    async def frames(self, key: Hashable, factory: Callable[[], Callable[[], bytes]], fps: float = 20.0):
+        """Async-Iterator über die JPEGs des Producers (blockiert keinen Worker-Thread)."""
+        p, (loop, ev) = self._subscribe(key, factory, fps)
+        last = 0
+        try:
+            while True:
+                item = p.latest()
+                if item is not None and item[0] != last:
+                    if last and item[0] > last + 1:
+                        p.st["skipped"] += item[0] - last - 1
+                    last = item[0]
+                    yield item[1]
+                    continue
+                if p.stopped:
+                    return
+                await ev.wait()
+                ev.clear()
+        finally:
+            self._unsubscribe(p, (loop, ev))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            prods = list(self._producers.values())
+            s: Dict[str, Any] = dict(self.st)
+        s["producers"] = [dict(p.st, subscribers=p.subscribers()) for p in prods]
+        return s
+
+
+MJPEG_HUB = MjpegHub()
@@ -9,7 +9,9 @@ from screeny.config import MEDIA_DIR
 
 import cv2
 import numpy as np
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
+
+from .fonts import load_font
 
 log = logging.getLogger(__name__)
 
@@ -511,20 +513,7 @@ def _make_thumbnail_jpeg(file_or_token: str, size: Tuple[int, int] = (256, 256))
             img = Image.new("RGB", (W, H), bg_rgb)
             draw = ImageDraw.Draw(img)
 
-            CANDS = [
-                "DejaVuSans.ttf",
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-                "/System/Library/Fonts/Supplemental/Arial Unicode.ttf",
-                "Arial Unicode.ttf",
-            ]
-            font = None
-            for fp in CANDS:
-                try:
-                    font = ImageFont.truetype(fp, size=font_size); break
-                except Exception:
-                    continue
-            if font is None:
-                font = ImageFont.load_default()
+            font = load_font(font_size)
 
             tw, th = font.getbbox(text)[2:]
             x = max(0, (W - tw)//2)
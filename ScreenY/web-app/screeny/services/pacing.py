@@ -0,0 +1,195 @@
+import threading, time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Optional
+
+from .telemetry import TELEMETRY
+
+# Ab dieser Restzeit wird nicht mehr geschlafen, sondern aktiv gewartet.
+# time.sleep() wacht auf dem Pi gerne 0.1–1 ms zu spät auf.
+SPIN_S = 0.0015
+
+
+def wait_until(t_deadline: float, *, spin_s: float = SPIN_S,
+               should_abort: Optional[Callable[[], bool]] = None,
+               wake: Optional[threading.Event] = None) -> Optional[float]:
+    """
+    Hybrides Warten bis perf_counter() >= t_deadline: grob schlafen, die
+    letzte Millisekunde spinnen. Gibt die Verspätung in Sekunden zurück
+    (>= 0, wenn der Termin schon vorbei war). Mit `wake` wird auf das Event
+    gewartet – ein set() bricht sofort ab statt erst beim nächsten Abfragen.
+    None, wenn should_abort/wake das Warten beendet hat.
+    """
+    while True:
+        left = t_deadline - time.perf_counter()
+        if left <= spin_s:
+            break
+        if should_abort and should_abort():
+            return None
+        if wake is not None:
+            if wake.wait(left - spin_s):
+                return None
+            continue
+        # lange Wartezeiten stückeln, damit Abbrüche greifen
+        time.sleep(min(left - spin_s, 0.05))
+    while time.perf_counter() < t_deadline:
+        pass
+    return time.perf_counter() - t_deadline
+
+
+class LatenessHistogram:
+    """Feste Buckets (ms) für die Verspätung gegenüber der Deadline."""
+    EDGES_MS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 50, 100)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.EDGES_MS) + 1)
+        self.n = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.dropped = 0        # verworfene Frames (zu spät)
+        self.skipped = 0        # übersprungene Ticks (Live-Quellen)
+        self.run_frames = 0
+        self.run_s = 0.0
+
+    def add(self, late_s: float):
+        ms = max(0.0, late_s * 1000.0)
+        self.counts[bisect_left(self.EDGES_MS, ms)] += 1
+        self.n += 1
+        self.sum_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def _pct(self, q: float) -> Optional[float]:
+        if not self.n:
+            return None
+        need, acc = q * self.n, 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= need:
+                return self.EDGES_MS[i] if i < len(self.EDGES_MS) else round(self.max_ms, 2)
+        return round(self.max_ms, 2)
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"<={e}" for e in self.EDGES_MS] + [f">{self.EDGES_MS[-1]}"]
+        return {
+            "frames": self.n,
+            "dropped": self.dropped,
+            "skipped": self.skipped,
+            "achieved_fps": round(self.run_frames / self.run_s, 2) if self.run_s > 0 else None,
+            "mean_ms": round(self.sum_ms / self.n, 3) if self.n else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self._pct(0.50),
+            "p95_ms": self._pct(0.95),
+            "p99_ms": self._pct(0.99),
+            "bins_ms": dict(zip(labels, self.counts)),
+        }
+
+
+class PacingStats:
+    """Prozessweite Histogramme, je Pfad und Ziel-FPS (z.B. 'video@25')."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._h: Dict[str, LatenessHistogram] = {}
+
+    def get(self, kind: str, fps: float) -> LatenessHistogram:
+        key = f"{kind}@{fps:g}" if fps else kind
+        with self._lock:
+            h = self._h.get(key)
+            if h is None:
+                h = self._h[key] = LatenessHistogram()
+            return h
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {k: h.snapshot() for k, h in sorted(self._h.items())}
+
+    def reset(self):
+        with self._lock:
+            self._h.clear()
+
+
+PACING_STATS = PacingStats()
+
+
+class FramePacer:
+    """
+    Taktgeber mit absoluten Deadlines: Frame k ist fällig bei t0 + k/fps.
+    Kein Nachführen von t0 -> keine Drift. Wer mehr als eine Periode zu spät
+    ist, wird verworfen (Datei-Quellen) bzw. die verpassten Ticks werden
+    übersprungen (Live-Quellen).
+
+        pacer = FramePacer(25, kind="video")
+        for frame in frames:
+            ok = pacer.wait_frame(lead=led.sync_lead(profile))
+            if ok is None:
+                break                         # geweckt/abgebrochen -> nichts mehr senden
+            if not ok:
+                continue                      # zu spät -> nicht senden
+            led.send_frame(frame, sync_at=pacer.deadline)
+        pacer.close()
+    """
+
+    def __init__(self, fps: float, *, kind: str = "video", drop_late: bool = True,
+                 should_abort: Optional[Callable[[], bool]] = None,
+                 wake: Optional[threading.Event] = None,
+                 stats: PacingStats = PACING_STATS):
+        self.fps = max(1e-3, float(fps or 25.0))
+        self.period = 1.0 / self.fps
+        self.drop_late = drop_late
+        self.should_abort = should_abort
+        self.wake = wake
+        self.hist = stats.get(kind, round(self.fps, 2))
+        TELEMETRY.target(self.fps)
+        self.t0: Optional[float] = None
+        self.index = 0
+        self.deadline = 0.0
+        self.sent = 0
+
+    def start(self, t0: Optional[float] = None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.index = 0
+
+    def frames_behind(self) -> int:
+        """Wie viele Perioden liegt Frame `index` schon hinter der Uhr?"""
+        if self.t0 is None:
+            return 0
+        return max(0, int((time.perf_counter() - (self.t0 + self.index * self.period)) / self.period))
+
+    def skip(self, n: int = 1):
+        """n Frames ohne Senden überspringen (z.B. cap.grab())."""
+        self.index += n
+        self.hist.dropped += n
+        TELEMETRY.drop(n)
+
+    def wait_frame(self, lead: float = 0.0) -> Optional[bool]:
+        """
+        Bis (Deadline - lead) von Frame `index` warten. False, wenn der Frame
+        verworfen werden soll; `deadline` zeigt danach auf den Sollzeitpunkt.
+        None, wenn `wake`/should_abort das Warten beendet hat – der Frame
+        gehört dann nicht mehr gesendet.
+        """
+        if self.t0 is None:
+            self.start()
+        behind = self.frames_behind()
+        if behind >= 1:
+            if self.drop_late:
+                self.index += 1
+                self.hist.dropped += 1
+                TELEMETRY.drop()
+                return False
+            self.index += behind
+            self.hist.skipped += behind
+        self.deadline = self.t0 + self.index * self.period
+        late = wait_until(self.deadline - lead, should_abort=self.should_abort, wake=self.wake)
+        if late is None:
+            return None
+        self.hist.add(late)
+        self.index += 1
+        self.sent += 1
+        return True
+
+    def close(self):
+        if self.t0 is not None and self.sent:
+            self.hist.run_frames += self.sent
+            self.hist.run_s += max(self.period, time.perf_counter() - self.t0)
+        self.sent = 0
@@ -1,3 +1,4 @@
+import itertools
 import logging
 import math
 import threading, time, os
@@ -7,23 +8,37 @@ import base64, json
 
 from PIL import Image, ImageDraw, ImageFont 
 
-from .weather import WX_CITY, WeatherCache, render_clock_panel
+from .weather import WX_CITY, WeatherCache, ClockRenderer
 from ..config import MEDIA_DIR
 from .playlists import is_image, is_video, is_stream
 from .text_renderer import TextRenderer
+from .pacing import FramePacer, wait_until
+from .preloader import Preloader, load_image_bgr
+from .transcode import TRANSCODER
+from .frame_cache import FRAME_CACHE
+from .telemetry import TELEMETRY
+from .animated import ANIMATIONS, is_animated_ext
+from .windows import ItemWindows
 
 log = logging.getLogger(__name__)
 
 class Player(threading.Thread):
+    # Durchlauf ohne ein gespieltes Item (alles fehlt/defekt): so lange warten, verdoppelnd
+    IDLE_MIN_S = 0.5
+    IDLE_MAX_S = 30.0
+
     def __init__(self, led):
         super().__init__(daemon=True)
         self.led = led
         self._stop = threading.Event()
         self._abort = threading.Event()
         self._lock = threading.RLock()
+        self._cmd = threading.Condition(self._lock)   # weckt den Player bei load/stop
+        self._t_cmd = None          # (Befehl, perf_counter) bis zum ersten Frame
         self._cur = None
         self._ver = 0
         self._wx = WeatherCache()
+        self._clock = ClockRenderer()
         self._state_lock = threading.Lock()
         self._state = {
             "active": False,
@@ -35,6 +50,8 @@ class Player(threading.Thread):
         }
         self._req = None
         self._text = TextRenderer(self.led)
+        self._pre = Preloader(self.led, text=self._text, wx=self._wx)
+        self._lat = {"cmd": None, "last_ms": None, "avg_ms": None, "max_ms": None, "count": 0}
 
         self.on_now_playing = None
         self.on_playlist_start = None
@@ -49,14 +66,52 @@ class Player(threading.Thread):
             s = dict(self._state)
             if s.get("item"):
                 s["item"] = dict(s["item"])
-            return s
+            s["latency"] = dict(self._lat)
+        s["preload"] = self._pre.stats()
+        s["telemetry"] = TELEMETRY.summary()
+        return s
+
+    def _should_abort(self) -> bool:
+        return self._stop.is_set() or self._abort.is_set()
+
+    def _command(self, name: str):
+        """Befehl vermerken (Latenz bis zum ersten Frame) und den Player wecken."""
+        self._t_cmd = (name, time.perf_counter())
+        self._abort.set()
+        self._cmd.notify_all()
+
+    def _arm_latency(self):
+        """Ab jetzt zählt der nächste gesendete Frame als Antwort auf den letzten Befehl."""
+        with self._lock:
+            cmd, self._t_cmd = self._t_cmd, None
+        if not cmd:
+            return
+        name, t0 = cmd
+
+        def done(t1):
+            ms = round((t1 - t0) * 1000.0, 1)
+            with self._state_lock:
+                lat = self._lat
+                n = lat["count"] + 1
+                lat.update(cmd=name, last_ms=ms, count=n,
+                           avg_ms=round(((lat["avg_ms"] or 0.0) * (n - 1) + ms) / n, 1),
+                           max_ms=max(lat["max_ms"] or 0.0, ms))
+        self.led.on_next_frame(done)
+
+    def _wait_command(self, ver, timeout=None):
+        """Ohne Playlist schlafen, bis load()/stop_playlist() die Version ändert (oder timeout)."""
+        with self._cmd:
+            self._cmd.wait_for(lambda: self._ver != ver or self._stop.is_set(), timeout)
 
     def stop_playlist(self):
         with self._lock:
             self._cur = None
             self._ver += 1
             self._req = None
-        self._abort.set()
+            self._t_cmd = None      # kein Frame erwartet
+            self._abort.set()
+            self._cmd.notify_all()
+        self._pre.cancel()
         self._set_state(active=False, playlist=None, index=-1, total=0, item=None, started=None)
 
 
@@ -66,18 +121,18 @@ class Player(threading.Thread):
             self._ver += 1
             name = (playlist_dict or {}).get("name")
             total = len((playlist_dict or {}).get("items", []))
+            self._command("load")
         self._set_state(active=bool(total), playlist=name, index=0 if total else -1, total=total, item=None, started=time.time())
-        self._abort.set()
 
     def next(self):
         with self._lock:
             self._req = "next"
-            self._abort.set()
+            self._command("next")
 
     def prev(self):
         with self._lock:
             self._req = "prev"
-            self._abort.set()
+            self._command("prev")
 
     def _emit_now_playing(self, *, title, playlist, file_or_token):
         cb = getattr(self, "on_now_playing", None)
@@ -87,20 +142,92 @@ class Player(threading.Thread):
             except Exception as e:
                 log.debug("on_now_playing callback failed: %s", e)
 
+    def _item_info(self, it):
+        """Playlist-Item -> Quelle, Typ und Wiedergabe-Parameter (None = überspringen)."""
+        raw = (it.get("file") or "").strip()
+        if not raw and not it.get("text"):
+            return None
+
+        if "://" in raw or os.path.isabs(raw):
+            src = raw; local = False
+        else:
+            src = os.path.join(MEDIA_DIR, raw); local = True
+
+        mode = (it.get("mode") or "fill").lower()
+        if mode not in ("fill", "fit"): mode = "fill"
+
+        # Typ
+        if raw.startswith("clock://"):
+            typ = "clock"; local = False
+        elif is_stream(src):
+            typ = "stream"
+        elif is_video(src):
+            typ = "video"
+        elif is_image(src):
+            typ = "image"
+        elif it.get("text") or raw.lower().startswith("text://"):
+            typ = "text" 
+        else:
+            typ = "other"
+
+        if typ == "video" and local:
+            # Kopie in Wandauflösung, falls schon vorhanden (sonst wird sie erzeugt)
+            src = TRANSCODER.lookup(src, self.led.screen_w, self.led.screen_h, mode) or src
+
+        return {
+            "raw": raw, "src": src, "local": local, "typ": typ, "mode": mode,
+            "duration": int(it.get("duration", 0) or 0),
+            "loops": max(1, int(it.get("loop", 1) or 1)),
+        }
+
+    def _preload_key(self, ver, idx, info):
+        return (ver, idx, info["src"], info["typ"], info["mode"], self.led.screen_w, self.led.screen_h)
+
+    def _preload_next(self, ver, items, order, pos, p_mode, win=None):
+        """Nächstes Item (ohne prev/next) im Hintergrund vorbereiten."""
+        nxt = pos + 1
+        if win is not None and win.active:
+            nxt = win.find(time.time(), nxt)
+            if nxt is None and p_mode == "repeat":
+                nxt = win.find(time.time(), 0)
+            if nxt is None:
+                return
+        if nxt >= len(order):
+            if p_mode != "repeat":
+                return              # random mischt neu, once endet
+            nxt = 0
+        idx = order[nxt]
+        it = items[idx]
+        info = self._item_info(it)
+        if not info or info["typ"] == "other":
+            return
+        if info["typ"] in ("image", "video") and not os.path.exists(info["src"]):
+            return
+        extra = {}
+        if info["typ"] == "text":
+            cfg = TextRenderer.build_text_cfg(info["raw"], it)
+            extra["cfg"] = {k: cfg[k] for k in ("text", "color", "bg", "font_size", "speed_px_s",
+                                                "duration", "align_h", "align_v")}
+        elif info["typ"] == "clock":
+            extra["weather"] = "weather" in info["raw"].lower()
+        self._pre.request(self._preload_key(ver, idx, info), info["typ"], info["src"], info["mode"], extra)
+
     def run(self):
         pos = 0
         order = []
+        win = None
         last_ver = -1
+        played = False      # im aktuellen Durchlauf mindestens ein Frame gesendet
+        idle = 0.0          # aktuelle Wartezeit nach leeren Durchläufen
 
         while not self._stop.is_set():
-            time.sleep(0.05)
-
             with self._lock:
                 pl = self._cur
                 cur_ver = self._ver
 
             if not pl or not pl.get("items"):
                 self._set_state(active=False, item=None)
+                self._wait_command(cur_ver)
                 continue
 
             items = pl["items"]
@@ -111,11 +238,15 @@ class Player(threading.Thread):
             if cur_ver != last_ver:
                 last_ver = cur_ver
                 pos = 0
+                played, idle = False, 0.0
                 self._req = None
                 self._abort.clear()
+                self._arm_latency()
                 order = list(range(len(items)))
                 if p_mode == "random":
                     random.shuffle(order)
+                win = ItemWindows(items)
+                win.set_order(order)
 
                 self._set_state(
                     active=True,
@@ -133,49 +264,66 @@ class Player(threading.Thread):
 
             if not order:
                 self._set_state(active=False, item=None, index=-1)
+                self._wait_command(cur_ver)
                 continue
 
             if pos < 0: pos = 0
             if pos >= len(order):
+                if not played and p_mode != "once":
+                    # nichts spielbar (Dateien fehlen, Streams tot ...) -> nicht im Kreis drehen;
+                    # load()/stop_playlist() wecken sofort
+                    idle = min(self.IDLE_MAX_S, idle * 2) if idle else self.IDLE_MIN_S
+                    self._set_state(item=None, index=-1)
+                    self._wait_command(cur_ver, idle)
+                    with self._lock:
+                        if self._ver != cur_ver:
+                            continue
+                        self._abort.clear()     # prev/next während des Wartens verwerfen
+                        self._req = None
+                elif played:
+                    idle = 0.0
+                played = False
                 if p_mode == "repeat":
                     pos = 0
                 elif p_mode == "random":
                     random.shuffle(order)
+                    win.set_order(order)
                     pos = 0
                 else:  # once
                     self._set_state(active=False, item=None, index=-1)
+                    self._wait_command(cur_ver)
                     continue
 
+            # Start/Ende-Fenster: nächstes spielbare Item, sonst bis zur nächsten Grenze schlafen
+            if win.active:
+                now = time.time()
+                if not win.any(now):
+                    t_next = win.next_change(now)
+                    self._set_state(item=None, index=-1, waiting_until=t_next)
+                    self._wait_command(cur_ver, None if t_next is None else max(0.0, t_next - now))
+                    with self._lock:
+                        if self._ver == cur_ver:
+                            self._abort.clear()     # prev/next ohne spielbares Item verwerfen
+                            self._req = None
+                    continue
+                nxt = win.find(now, pos)
+                if nxt is None:
+                    pos = len(order)    # Rest der Liste außerhalb der Fenster -> Listenende
+                    continue
+                pos = nxt
+
             real_idx = order[pos]
             it = items[real_idx]
-            raw = (it.get("file") or "").strip()
-            if not raw and not it.get("text"):
+            info = self._item_info(it)
+            if not info:
                 pos += 1
                 continue
+            raw, src, local, typ = info["raw"], info["src"], info["local"], info["typ"]
+            mode, duration, loops = info["mode"], info["duration"], info["loops"]
 
-            if "://" in raw or os.path.isabs(raw):
-                src = raw; local = False
-            else:
-                src = os.path.join(MEDIA_DIR, raw); local = True
-
-            mode = (it.get("mode") or "fill").lower()
-            if mode not in ("fill", "fit"): mode = "fill"
-            duration = int(it.get("duration", 0) or 0)
-            loops = max(1, int(it.get("loop", 1) or 1))
-
-            # Typ
-            if raw.startswith("clock://"):
-                typ = "clock"; local = False
-            elif is_stream(src):
-                typ = "stream"
-            elif is_video(src):
-                typ = "video"
-            elif is_image(src):
-                typ = "image"
-            elif it.get("text") or raw.lower().startswith("text://"):
-                typ = "text" 
-            else:
-                typ = "other"
+            # vorbereitetes Ergebnis übernehmen (None, wenn prev/next o.ä. dazwischenkam)
+            prep = self._pre.take(self._preload_key(cur_ver, real_idx, info)) or {}
+            self._preload_next(cur_ver, items, order, pos, p_mode, win)
 
             state_file = raw or it.get("file") or ""
 
@@ -185,6 +333,7 @@ class Player(threading.Thread):
                 playlist_mode=p_mode,
                 index=real_idx,
                 total=len(items),
+                waiting_until=None,
                 item={"file": state_file, "type": typ, "local": local, "mode": mode, "duration": duration, "loop": loops}
             )
 
@@ -194,21 +343,35 @@ class Player(threading.Thread):
             except Exception as _e:
                 log.debug("emit now_playing failed: %s", _e)
 
+            TELEMETRY.begin_item((pl.get("name"), real_idx, state_file), state_file or typ, typ)
+            n_in = self.led.frames_in
             try:
                 if typ == "stream":
                     max_seconds = None if duration <= 0 else float(duration * loops)
                     self.led.play_stream(
                         src, fps_limit=25.0, mode=mode,
                         max_seconds=max_seconds,
-                        should_abort=lambda: self._stop.is_set() or self._abort.is_set()
+                        should_abort=self._should_abort, wake=self._abort
                     )
 
                 elif typ == "video":
+                    # wird der Clip wiederholt, lohnt der Rohframe-Cache (ohne Decoder)
+                    replay = local and (loops > 1 or p_mode == "repeat")
                     for _ in range(loops):
-                        self.led.play_video(
-                            src, fps_limit=None, mode=mode,
-                            should_abort=lambda: self._stop.is_set() or self._abort.is_set()
-                        )
+                        clip = FRAME_CACHE.lookup(src, self.led.screen_w, self.led.screen_h, mode) if replay else None
+                        if clip is not None:
+                            self.led.play_frames(
+                                clip.frames, clip.fps, mode=mode,
+                                should_abort=self._should_abort, wake=self._abort
+                            )
+                        else:
+                            self.led.play_video(
+                                src, fps_limit=None, mode=mode,
+                                should_abort=self._should_abort, wake=self._abort,
+                                cap=prep.pop("cap", None), first=prep.pop("first", None),
+                                record=FRAME_CACHE.recorder(src, self.led.screen_w, self.led.screen_h, mode)
+                                       if replay else None
+                            )
                         if self._stop.is_set() or self._abort.is_set():
                             break
 
@@ -217,95 +380,114 @@ class Player(threading.Thread):
                     show_date = ("time_date" in variant)
                     show_wx = ("weather" in variant)
                     t_end = None if (duration <= 0) else (time.time() + duration * loops)
+                    TELEMETRY.target(1.0)     # ein Frame pro Sekunde
+                    wx_pre = prep.pop("wx", None)   # vom Preloader geholt -> erster Frame ohne Abruf
                     while True:
                         if self._stop.is_set() or self._abort.is_set(): break
                         wx = None
                         if show_wx:
-                            try: wx = self._wx.get()
-                            except Exception: wx = None
+                            if wx_pre is not None:
+                                wx, wx_pre = wx_pre, None
+                            else:
+                                try: wx = self._wx.get()
+                                except Exception: wx = None
                         w, h = self.led.screen_w, self.led.screen_h
-                        img = render_clock_panel(size=(w, h),
+                        t_r = time.perf_counter()
+                        # statische Ebene nur bei neuen Wetterdaten/Datum, sonst nur die Ziffern
+                        arr = self._clock.render(size=(w, h),
                                                  show_seconds=True, show_date=show_date,
                                                  weather=(wx if show_wx else None), city=WX_CITY)
-                        arr = np.array(img, dtype=np.uint8)[:, :, ::-1]
+                        TELEMETRY.add("render", time.perf_counter() - t_r)
                         self.led.send_frame(arr, sync_profile="still")
                         if t_end and time.time() >= t_end: break
+                        # nächste volle Sekunde als absolute Deadline
                         now = time.time()
-                        time.sleep(max(0.05, 1.0 - (now - math.floor(now))))
+                        wait_until(time.perf_counter() + max(0.05, math.floor(now) + 1.0 - now),
+                                   should_abort=self._should_abort, wake=self._abort)
 
                 elif typ == "text":
                     cfg = TextRenderer.build_text_cfg(raw, it)
                     log.debug(f"Decoded text object: {cfg}")
 
+                    should_abort = self._should_abort
+                    pacer = FramePacer(TextRenderer.FPS, kind="text", drop_late=True,
+                                       should_abort=should_abort, wake=self._abort)
                     for _ in range(loops):
-                        for frame_rgb in self._text.render_once(
-                            text=cfg["text"],
-                            color=cfg["color"],
-                            bg=cfg["bg"],
-                            font_size=cfg["font_size"],
-                            speed_px_s=cfg["speed_px_s"],
-                            duration=cfg["duration"],
-                            align_h=cfg["align_h"],   
-                            align_v=cfg["align_v"],   
-                        ):
-                            self.led.send_frame(frame_rgb[:, :, ::-1], sync_profile="still", mode=mode)
-                            if self._stop.is_set() or self._abort.is_set():
+                        gen, first = prep.pop("gen", None), prep.pop("first", None)
+                        if gen is not None and first is not None:
+                            frames = itertools.chain([first], gen)   # vorgerendert
+                        else:
+                            frames = self._text.render_once(
+                                text=cfg["text"],
+                                color=cfg["color"],
+                                bg=cfg["bg"],
+                                font_size=cfg["font_size"],
+                                speed_px_s=cfg["speed_px_s"],
+                                duration=cfg["duration"],
+                                align_h=cfg["align_h"],   
+                                align_v=cfg["align_v"],   
+                            )
+                        frames = iter(frames)
+                        while True:
+                            t_r = time.perf_counter()
+                            frame_rgb = next(frames, None)
+                            if frame_rgb is None or should_abort():
                                 break
-                        if self._stop.is_set() or self._abort.is_set():
+                            TELEMETRY.add("render", time.perf_counter() - t_r)
+                            ok = pacer.wait_frame(lead=min(pacer.period, self.led.sync_lead("still")))
+                            if ok is None:
+                                break       # Abbruch/Befehl -> diesen Frame nicht mehr senden
+                            if not ok:
+                                continue
+                            self.led.send_frame(frame_rgb[:, :, ::-1], sync_profile="still", mode=mode,
+                                                sync_at=pacer.deadline)
+                        if should_abort():
                             break
+                    pacer.close()
 
                 else:
                     if not os.path.exists(src):
                         pos += 1
                         continue
-                    frame = cv2.imread(src, cv2.IMREAD_UNCHANGED)
-                    if frame is None:
-                        from PIL import Image as PILImage
-                        img = PILImage.open(src).convert("RGB")  # RGB
-                        frame = np.array(img)[..., ::-1]         # -> BGR
-
-                    if frame.ndim == 2:
-                        frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
-                    elif frame.shape[2] == 4:
-                        frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
-
                     H, W = getattr(self.led, "screen_h", 0) or (getattr(self.led, "grid_rows", 1) * getattr(self.led, "panel_h", 128)), \
                         getattr(self.led, "screen_w", 0) or (getattr(self.led, "grid_cols", 1) * getattr(self.led, "panel_w", 128))
                     if not H or not W:
                         H, W = 128, 128  # Fallback
 
-                    src_h, src_w = frame.shape[:2]
-                    if mode == "fit":
-                        # Contain: Einpassen + Letterbox
-                        s = min(W / src_w, H / src_h)
-                        nw, nh = max(1, int(round(src_w * s))), max(1, int(round(src_h * s)))
-                        resized = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_AREA)
-                        canvas = np.zeros((H, W, 3), dtype=np.uint8)
-                        y0 = (H - nh) // 2
-                        x0 = (W - nw) // 2
-                        canvas[y0:y0+nh, x0:x0+nw] = resized
-                        out = canvas
-                    else:
-                        # Cover: Zuschneiden nach Skalierung
-                        s = max(W / src_w, H / src_h)
-                        nw, nh = max(1, int(round(src_w * s))), max(1, int(round(src_h * s)))
-                        resized = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_AREA)
-                        # mittig auf Zielgröße croppen
-                        y0 = max(0, (nh - H) // 2)
-                        x0 = max(0, (nw - W) // 2)
-                        out = resized[y0:y0+H, x0:x0+W]
-
-                    # Jetzt exakt (H,W,3)
-                    self.led.send_frame(out, sync_profile="still", mode=mode)
-
                     wait_s = max(1, duration or 10)
-                    t_end = time.time() + (wait_s * loops)
-                    while time.time() < t_end:
-                        if self._stop.is_set() or self._abort.is_set(): break
-                        time.sleep(0.05)
+                    anim = prep.get("anim")
+                    if anim is None and is_animated_ext(src):
+                        t0 = time.perf_counter()
+                        anim = ANIMATIONS.get(src, W, H, mode)
+                        TELEMETRY.add("decode", time.perf_counter() - t0)
+                    if anim is not None and anim.frames.shape[1:3] == (H, W):
+                        # animiertes GIF/WebP: vordekodierte Frames im Takt ihrer Delays
+                        self.led.play_animation(anim.frames, anim.delays, wait_s * loops, mode=mode,
+                                                should_abort=self._should_abort, wake=self._abort)
+                    else:
+                        out = prep.get("frame")
+                        if out is None or out.shape[:2] != (H, W):
+                            t0 = time.perf_counter()
+                            frame = load_image_bgr(src)
+                            t1 = time.perf_counter()
+                            # fit = Einpassen + Letterbox, fill = mittig zuschneiden
+                            out = self.led.resizer.resize(frame, W, H, mode)
+                            TELEMETRY.add("decode", t1 - t0)
+                            TELEMETRY.add("scale", time.perf_counter() - t1)
+
+                        # Jetzt exakt (H,W,3)
+                        self.led.send_frame(out, sync_profile="still", mode=mode)
+
+                        wait_until(time.perf_counter() + wait_s * loops,
+                                   should_abort=self._should_abort, wake=self._abort)
 
             except Exception as e:
                 import logging; logging.getLogger(__name__).warning("play error: %s", e)
+            finally:
+                TELEMETRY.end_item()
+                self._pre.discard(prep)
+                if self.led.frames_in != n_in:
+                    played = True
 
             if self._stop.is_set():
                 self._set_state(active=False)
@@ -317,19 +499,16 @@ class Player(threading.Thread):
                     self._abort.clear()
                     req = self._req
                     self._req = None
+                    if req:
+                        self._arm_latency()
 
             if req == "prev":
                 pos = (pos - 1) % len(order)
+                if win.active:
+                    now = time.time()
+                    p = win.find(now, pos, back=True)
+                    pos = p if p is not None else (win.find(now, len(order) - 1, back=True) or 0)
             elif req == "next":
                 pos = (pos + 1) % len(order)
             else:
-                pos += 1
-                if pos >= len(order):
-                    if p_mode == "repeat":
-                        pos = 0
-                    elif p_mode == "random":
-                        random.shuffle(order)
-                        pos = 0
-                    else:
-                        self._set_state(active=False, item=None, index=-1)
-                        continue
+                pos += 1        # Listenende behandelt der Schleifenkopf
@@ -0,0 +1,182 @@
+import logging, threading, time
+from typing import Any, Dict, Optional
+
+import cv2, numpy as np
+
+from .animated import ANIMATIONS, is_animated_ext
+
+log = logging.getLogger(__name__)
+
+
+def load_image_bgr(src: str) -> Optional[np.ndarray]:
+    """Bild als BGR (3 Kanäle) laden – cv2, Fallback PIL."""
+    frame = cv2.imread(src, cv2.IMREAD_UNCHANGED)
+    if frame is None:
+        from PIL import Image as PILImage
+        img = PILImage.open(src).convert("RGB")  # RGB
+        frame = np.array(img)[..., ::-1]         # -> BGR
+    if frame.ndim == 2:
+        frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+    elif frame.shape[2] == 4:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+    return frame
+
+
+class Preloader:
+    """
+    Bereitet das nächste Playlist-Item in einem eigenen Thread vor, während
+    das aktuelle läuft:
+    - image:  geladen + auf Wandgröße skaliert (GIF/WebP: alle Frames)
+    - video:  Capture geöffnet (playback.decoder), erster Frame dekodiert
+    - stream: nur Erreichbarkeit geprüft (Capture sofort wieder zu – eine
+              offene Verbindung puffert sonst veraltete Frames; die
+              Live-Capture öffnet StreamIngest beim Start des Items)
+    - text:   Render-Generator angelegt, erster Frame gerendert
+    - clock:  Wetterdaten vorab geholt (erster Frame des Items nutzt sie)
+
+    Der Schlüssel enthält Playlist-Version, Index, Quelle und Wandgröße;
+    passt er bei take() nicht (prev/next, neue Playlist, Layout), wird das
+    Vorbereitete verworfen und Ressourcen werden freigegeben.
+    """
+
+    def __init__(self, led, text=None, wx=None):
+        self.led = led
+        self.text = text
+        self.wx = wx
+        self._cv = threading.Condition()
+        self._job = None            # (key, typ, src, mode, extra) – wartet auf den Worker
+        self._busy = None           # key, der gerade vorbereitet wird
+        self._done = None           # (key, result)
+        self._thread = None
+        self.st = {"requested": 0, "hits": 0, "misses": 0, "discarded": 0, "errors": 0, "prep_ms": 0.0}
+
+    # --- API (Player-Thread) ---
+    def request(self, key, typ: str, src: str, mode: str, extra: Optional[Dict[str, Any]] = None):
+        with self._cv:
+            if key in (self._busy, self._job and self._job[0], self._done and self._done[0]):
+                return
+            self._drop_done()
+            self._job = (key, typ, src, mode, extra or {})
+            self.st["requested"] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="preloader")
+                self._thread.start()
+            self._cv.notify_all()
+
+    def take(self, key, timeout: float = 5.0) -> Optional[Dict[str, Any]]:
+        """Vorbereitetes Ergebnis für key holen (wartet, falls gerade in Arbeit)."""
+        t_end = time.monotonic() + timeout
+        with self._cv:
+            while self._busy == key or (self._job and self._job[0] == key):
+                left = t_end - time.monotonic()
+                if left <= 0:
+                    break
+                self._cv.wait(left)
+            if self._done and self._done[0] == key:
+                res = self._done[1]
+                self._done = None
+                self.st["hits"] += 1
+                return res
+            self._job = None
+            self._drop_done()
+            self.st["misses"] += 1
+            return None
+
+    def cancel(self):
+        with self._cv:
+            self._job = None
+            self._drop_done()
+
+    @staticmethod
+    def discard(res: Optional[Dict[str, Any]]):
+        """Nicht (vollständig) verbrauchtes Ergebnis freigeben."""
+        _release(res)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cv:
+            s = dict(self.st)
+        s["prep_ms"] = round(s["prep_ms"], 1)
+        return s
+
+    # --- intern ---
+    def _drop_done(self):
+        if self._done:
+            _release(self._done[1])
+            self._done = None
+            self.st["discarded"] += 1
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while self._job is None:
+                    self._cv.wait()
+                key, typ, src, mode, extra = self._job
+                self._job = None
+                self._busy = key
+            t0 = time.perf_counter()
+            res = None
+            try:
+                res = self._prepare(typ, src, mode, extra)
+            except Exception as e:
+                self.st["errors"] += 1
+                log.debug("preload %s failed: %s", src, e)
+            with self._cv:
+                self._busy = None
+                self.st["prep_ms"] += (time.perf_counter() - t0) * 1000.0
+                if res is not None and self._job is None:
+                    self._drop_done()
+                    self._done = (key, res)
+                else:
+                    _release(res)       # inzwischen überholt
+                self._cv.notify_all()
+
+    def _prepare(self, typ: str, src: str, mode: str, extra: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if typ == "image":
+            W, H = self.led.screen_w, self.led.screen_h
+            if is_animated_ext(src):
+                anim = ANIMATIONS.get(src, W, H, mode)
+                if anim is not None:
+                    return {"anim": anim}
+            frame = load_image_bgr(src)
+            if frame is None:
+                return None
+            # Resize-Puffer sind pro Thread -> Kopie für die Übergabe
+            return {"frame": np.array(self.led.resizer.resize(frame, W, H, mode))}
+
+        if typ == "video":
+            cap = self.led.open_capture(src, mode)
+            if not cap.isOpened():
+                cap.release()
+                return None
+            ok, first = cap.read()
+            # ffmpeg-Pipe liefert eine Sicht auf ihren Lesepuffer -> kopieren
+            return {"cap": cap, "first": np.array(first) if ok else None}
+
+        if typ == "stream":
+            cap = self.led.open_capture(src, mode, fps=25.0, stream=True)
+            try:
+                return {"reachable": True} if cap.isOpened() else None
+            finally:
+                cap.release()
+
+        if typ == "text" and self.text is not None:
+            gen = self.text.render_once(**extra["cfg"])
+            first = next(gen, None)
+            return {"gen": gen, "first": first}
+
+        if typ == "clock" and self.wx is not None and extra.get("weather"):
+            return {"wx": self.wx.get()}
+
+        return None
+
+
+def _release(res: Optional[Dict[str, Any]]):
+    if not res:
+        return
+    cap = res.get("cap")
+    if cap is not None:
+        try: cap.release()
+        except Exception: pass
+    gen = res.get("gen")
+    if gen is not None:
+        gen.close()
@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+
+class ResizePlan:
+    """
+    Vorberechnete Skalierung (src_w, src_h) -> (dst_w, dst_h) für fit/fill.
+    Der Zielpuffer wird einmal angelegt; cv2.resize schreibt per dst= direkt
+    hinein.
+    - fit:  Letterbox-Canvas, Bild landet in einem festen Ausschnitt, die
+            schwarzen Ränder werden nie überschrieben
+    - fill: Quell-Ausschnitt mit Zielseitenverhältnis wird direkt auf die volle
+            Fläche skaliert (kein Zwischenbild, kein Crop-Copy)
+    """
+
+    def __init__(self, src_size: Tuple[int, int], dst_size: Tuple[int, int], mode: str):
+        sw, sh = src_size
+        tw, th = dst_size
+        self.mode = mode
+        self.out = np.zeros((th, tw, 3), dtype=np.uint8)
+        if mode == "fit":
+            s = min(tw / sw, th / sh)
+            nw = min(tw, max(1, int(round(sw * s))))
+            nh = min(th, max(1, int(round(sh * s))))
+            x0, y0 = (tw - nw) // 2, (th - nh) // 2
+            self.src_roi = (slice(None), slice(None))
+            self.dst = self.out[y0:y0 + nh, x0:x0 + nw]
+        else:
+            s = max(tw / sw, th / sh)
+            cw = min(sw, max(1, int(round(tw / s))))
+            ch = min(sh, max(1, int(round(th / s))))
+            x0, y0 = (sw - cw) // 2, (sh - ch) // 2
+            self.src_roi = (slice(y0, y0 + ch), slice(x0, x0 + cw))
+            self.dst = self.out
+        self.size = (self.dst.shape[1], self.dst.shape[0])
+        self.interp = cv2.INTER_AREA if s < 1 else cv2.INTER_LINEAR
+
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        cv2.resize(frame[self.src_roi], self.size, dst=self.dst, interpolation=self.interp)
+        return self.out
+
+
+class ResizeCache:
+    """
+    Pläne je (Quellgröße, Zielgröße, Modus). Die Puffer werden pro Thread
+    gehalten (Player, Sender und Text-Stream skalieren parallel); das Ergebnis
+    ist nur bis zum nächsten Aufruf im selben Thread gültig.
+    """
+
+    def __init__(self, max_plans: int = 8):
+        self.max_plans = max_plans
+        self._tls = threading.local()
+
+    def _plans(self) -> "OrderedDict":
+        p = getattr(self._tls, "plans", None)
+        if p is None:
+            p = self._tls.plans = OrderedDict()
+        return p
+
+    def resize(self, frame: np.ndarray, target_w: int, target_h: int, mode: str = "fit") -> np.ndarray:
+        H, W = frame.shape[:2]
+        if (W, H) == (target_w, target_h):
+            return frame
+        mode = "fit" if mode == "fit" else "fill"
+        key = (W, H, target_w, target_h, mode)
+        plans = self._plans()
+        plan = plans.get(key)
+        if plan is None:
+            plan = plans[key] = ResizePlan((W, H), (target_w, target_h), mode)
+            while len(plans) > self.max_plans:
+                plans.popitem(last=False)
+        else:
+            plans.move_to_end(key)
+        return plan.apply(frame)
@@ -0,0 +1,161 @@
+import logging, threading, time
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+
+class StreamStats:
+    """Prozessweite Zähler der Live-Quellen (für /api/panels/stats)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.c = {"connects": 0, "reconnects": 0, "connect_failures": 0, "stalls": 0,
+                  "frames_in": 0, "frames_out": 0, "overwritten": 0}
+        self.connected = False
+        self.source = None
+        self.last_error = None
+        self.lat_ema = 0.0
+        self.lat_max = 0.0
+
+    def add(self, key: str, n: int = 1):
+        with self._lock:
+            self.c[key] += n
+
+    def sent(self, age_s: float):
+        ms = age_s * 1000.0
+        with self._lock:
+            self.c["frames_out"] += 1
+            self.lat_ema = ms if not self.lat_ema else self.lat_ema * 0.9 + ms * 0.1
+            if ms > self.lat_max:
+                self.lat_max = ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self.c)
+            s.update(connected=self.connected, source=self.source, last_error=self.last_error,
+                     latency_ms=round(self.lat_ema, 1), latency_max_ms=round(self.lat_max, 1))
+        return s
+
+
+STREAM_STATS = StreamStats()
+
+
+class StreamIngest:
+    """
+    Eigener Capture-Thread pro Live-Quelle. Es wird immer nur der neueste
+    Frame gehalten – sendet die Wand langsamer als die Kamera liefert, staut
+    sich nichts auf, ältere Frames werden einfach überschrieben.
+
+    - Reconnect mit exponentiellem Backoff (backoff_min_s .. backoff_max_s)
+    - Stall-Erkennung: kommt stall_s lang kein Frame, wird neu verbunden
+      (die Captures brechen blockierende Reads selbst per Timeout ab)
+    - latency_ms: Alter des Frames (gelesen -> gesendet)
+
+        ing = StreamIngest(lambda: led.open_capture(url, stream=True))
+        ing.start()
+        seq, frame, t_cap = ing.latest()
+        ing.close()
+    """
+
+    def __init__(self, open_fn: Callable[[], Any], *, cap=None, name: str = "",
+                 stall_s: float = 5.0, backoff_min_s: float = 0.5, backoff_max_s: float = 30.0,
+                 stats: StreamStats = STREAM_STATS):
+        self.open_fn = open_fn
+        self.name = name
+        self.stall_s = max(0.5, float(stall_s))
+        self.backoff_min_s = max(0.05, float(backoff_min_s))
+        self.backoff_max_s = max(self.backoff_min_s, float(backoff_max_s))
+        self.stats = stats
+        self._cap = cap             # bereits geöffnet (Preloader) -> erster Versuch
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._frame: Optional[np.ndarray] = None
+        self._t_cap = 0.0
+        self._taken = 0
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.stats.source = self.name
+        self._thread = threading.Thread(target=self._run, daemon=True, name="stream-ingest")
+        self._thread.start()
+        return self
+
+    def close(self, timeout: float = 0.5):
+        """Stoppen; ein noch blockierender Read gibt die Capture danach selbst frei."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def latest(self):
+        """(seq, frame, t_capture) des neuesten Frames oder None."""
+        with self._lock:
+            if self._frame is None:
+                return None
+            self._taken = self._seq
+            return self._seq, self._frame, self._t_cap
+
+    # --- Capture-Thread ---
+    def _publish(self, frame: np.ndarray):
+        if not frame.flags.owndata:
+            frame = frame.copy()    # ffmpeg-Pipe: Sicht auf den Lesepuffer
+        now = time.perf_counter()
+        with self._lock:
+            if self._frame is not None and self._taken != self._seq:
+                self.stats.add("overwritten")
+            self._seq += 1
+            self._frame, self._t_cap = frame, now
+        self.stats.add("frames_in")
+
+    def _run(self):
+        st = self.stats
+        backoff = self.backoff_min_s
+        first = True
+        while not self._stopping.is_set():
+            cap, self._cap = self._cap, None
+            if cap is None:
+                try:
+                    cap = self.open_fn()
+                except Exception as e:
+                    st.last_error = str(e)
+                    cap = None
+            if cap is None or not cap.isOpened():
+                if cap is not None:
+                    cap.release()
+                st.add("connect_failures")
+                st.last_error = st.last_error or "open failed"
+                log.debug("stream %s: connect failed, retry in %.1fs", self.name, backoff)
+                self._stopping.wait(backoff)
+                backoff = min(backoff * 2.0, self.backoff_max_s)
+                continue
+
+            st.add("connects" if first else "reconnects")
+            first = False
+            st.connected = True
+            t_last = time.perf_counter()
+            try:
+                while not self._stopping.is_set():
+                    ok, frame = cap.read()
+                    now = time.perf_counter()
+                    if ok and frame is not None:
+                        self._publish(frame)
+                        t_last = now
+                        backoff = self.backoff_min_s
+                        continue
+                    if now - t_last >= self.stall_s:
+                        st.add("stalls")
+                        st.last_error = f"no frame for {self.stall_s:g}s"
+                        log.info("stream %s stalled, reconnecting", self.name)
+                        break
+                    self._stopping.wait(0.02)
+            except Exception as e:
+                st.last_error = str(e)
+                log.debug("stream %s read failed: %s", self.name, e)
+            finally:
+                st.connected = False
+                cap.release()
+            if not self._stopping.is_set():
+                self._stopping.wait(backoff)
+                backoff = min(backoff * 2.0, self.backoff_max_s)
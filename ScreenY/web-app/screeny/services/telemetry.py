@@ -0,0 +1,162 @@
+import threading, time
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Stufen des Wiedergabepfads (ms pro Frame)
+STAGES = ("decode", "scale", "render", "encode", "packetize", "send", "sync")
+
+
+class MsHistogram:
+    """Feste Buckets (ms), keine Einzelwerte – Speicher bleibt konstant."""
+    EDGES_MS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 50, 100)
+    __slots__ = ("counts", "n", "sum_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(self.EDGES_MS) + 1)
+        self.n = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float):
+        self.counts[bisect_left(self.EDGES_MS, ms)] += 1
+        self.n += 1
+        self.sum_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def _pct(self, q: float) -> Optional[float]:
+        need, acc = q * self.n, 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= need:
+                return self.EDGES_MS[i] if i < len(self.EDGES_MS) else round(self.max_ms, 2)
+        return round(self.max_ms, 2)
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"<={e}" for e in self.EDGES_MS] + [f">{self.EDGES_MS[-1]}"]
+        return {
+            "n": self.n,
+            "mean_ms": round(self.sum_ms / self.n, 3) if self.n else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self._pct(0.50) if self.n else None,
+            "p95_ms": self._pct(0.95) if self.n else None,
+            "bins_ms": dict(zip(labels, self.counts)),
+        }
+
+
+class ItemStats:
+    """Zeiten und Zähler eines Playlist-Items, über alle Durchläufe summiert."""
+
+    def __init__(self, label: str, typ: str):
+        self.label = label
+        self.typ = typ
+        self.stages = {s: MsHistogram() for s in STAGES}
+        self.frames = 0
+        self.dropped = 0
+        self.runs = 0
+        self.run_s = 0.0
+        self.target_fps: Optional[float] = None
+        self.t0: Optional[float] = None
+        self.last = 0.0
+
+    def achieved_fps(self) -> Optional[float]:
+        run_s = self.run_s + (time.perf_counter() - self.t0 if self.t0 else 0.0)
+        return round(self.frames / run_s, 2) if run_s > 0 else None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "item": self.label,
+            "type": self.typ,
+            "runs": self.runs,
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "target_fps": round(self.target_fps, 2) if self.target_fps else None,
+            "achieved_fps": self.achieved_fps(),
+            "mean_ms": {s: round(h.sum_ms / h.n, 3) for s, h in self.stages.items() if h.n},
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        s = self.summary()
+        s["stages"] = {k: h.snapshot() for k, h in self.stages.items() if h.n}
+        return s
+
+
+class Telemetry:
+    """
+    Laufzeitmessung des Wiedergabepfads pro Playlist-Item. Der Player
+    meldet Item-Beginn/-Ende, die Stufen (Decoder, LedBroadcaster, ...)
+    melden nur Dauern – ohne laufendes Item kostet add() einen
+    Attribut-Check. Geschrieben wird ohne Lock (GIL), gelegentliche
+    Zählfehler unter Last sind für eine Statistik egal.
+
+        TELEMETRY.begin_item(key, "clip.mp4", "video")
+        t = time.perf_counter(); ...; TELEMETRY.add("decode", time.perf_counter() - t)
+        TELEMETRY.end_item()
+    """
+    MAX_ITEMS = 64
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[Any, ItemStats]" = OrderedDict()
+        self.cur: Optional[ItemStats] = None
+
+    # --- Player ---
+    def begin_item(self, key, label: str, typ: str):
+        with self._lock:
+            it = self._items.pop(key, None) or ItemStats(label, typ)
+            self._items[key] = it
+            while len(self._items) > self.MAX_ITEMS:
+                self._items.popitem(last=False)
+        it.runs += 1
+        it.t0 = time.perf_counter()
+        it.last = time.time()
+        self.cur = it
+
+    def end_item(self):
+        it, self.cur = self.cur, None
+        if it is not None and it.t0 is not None:
+            it.run_s += time.perf_counter() - it.t0
+            it.t0 = None
+
+    # --- Hot Path ---
+    def add(self, stage: str, dt_s: float):
+        it = self.cur
+        if it is not None:
+            it.stages[stage].add(dt_s * 1000.0)
+
+    def frame(self):
+        it = self.cur
+        if it is not None:
+            it.frames += 1
+
+    def drop(self, n: int = 1):
+        it = self.cur
+        if it is not None:
+            it.dropped += n
+
+    def target(self, fps: float):
+        it = self.cur
+        if it is not None:
+            it.target_fps = fps
+
+    # --- Ausgabe ---
+    def summary(self) -> Optional[Dict[str, Any]]:
+        it = self.cur
+        return it.summary() if it is not None else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            items = sorted(self._items.values(), key=lambda i: i.last, reverse=True)
+        return {
+            "current": self.summary(),
+            "items": [i.snapshot() for i in items],
+        }
+
+    def reset(self):
+        with self._lock:
+            self._items.clear()
+        self.cur = None
+
+
+TELEMETRY = Telemetry()
@@ -1,8 +1,80 @@
-import time, json, base64
-from typing import Generator, Tuple
+import time, json, base64, threading
+from collections import OrderedDict
+from typing import Any, Dict, Generator, Optional, Tuple
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
+from .fonts import load_font
+
+
+class TextPlan:
+    """
+    Fertig gerendertes Text-Item für eine Wandgröße:
+    statisch -> ein Frame, das `frames` mal geliefert wird,
+    Lauftext -> Streifen + Spalten-Offset je Frame.
+    """
+    __slots__ = ("frame", "strip", "offsets", "frames", "W", "H")
+
+    def __init__(self, W: int, H: int, *, frame: Optional[np.ndarray] = None, frames: int = 0,
+                 strip: Optional[np.ndarray] = None, offsets: Optional[np.ndarray] = None):
+        self.W, self.H = W, H
+        self.frame, self.strip, self.offsets = frame, strip, offsets
+        self.frames = len(offsets) if offsets is not None else frames
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.frame, self.strip, self.offsets) if a is not None)
+
+
+class TextPlanCache:
+    """
+    LRU (nach Bytes) der TextPlans, Schlüssel = cfg aus build_text_cfg +
+    Wandgröße. Ein Text-Item mit loop 5 oder in einer Endlos-Playlist wird
+    so nur einmal vermessen und gerendert, danach kostet es nur noch die
+    Frame-Kopien.
+    """
+    MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lru: "OrderedDict[tuple, TextPlan]" = OrderedDict()
+        self._bytes = 0
+        self.st = {"hits": 0, "misses": 0, "evicted": 0}
+
+    def get(self, key: tuple) -> Optional[TextPlan]:
+        with self._lock:
+            plan = self._lru.get(key)
+            if plan is None:
+                self.st["misses"] += 1
+                return None
+            self._lru.move_to_end(key)
+            self.st["hits"] += 1
+            return plan
+
+    def put(self, key: tuple, plan: TextPlan):
+        with self._lock:
+            old = self._lru.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._lru[key] = plan
+            self._bytes += plan.nbytes
+            while self._bytes > self.MAX_BYTES and len(self._lru) > 1:
+                _, old = self._lru.popitem(last=False)
+                self._bytes -= old.nbytes
+                self.st["evicted"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.st, entries=len(self._lru), mb=round(self._bytes / 1048576, 1))
+
+
+TEXT_PLANS = TextPlanCache()
+
 
 class TextRenderer:
     """
@@ -10,7 +82,13 @@ class TextRenderer:
     - Ausrichtung horizontal: align_h = left|center|right
     - Ausrichtung vertikal:   align_v = top|middle|bottom
     - Bearing (t) wird korrekt berücksichtigt -> nichts wird abgeschnitten.
+    Der Generator liefert FPS Frames pro Sekunde Laufzeit, getaktet wird
+    beim Aufrufer (FramePacer). Lauftext wird einmal in einen breiten Streifen
+    gerendert; jedes Frame ist ein Ausschnitt davon in einem festen Puffer und
+    bleibt nur bis zum nächsten Frame gültig. Layout und Streifen liegen als
+    TextPlan im TEXT_PLANS-Cache (Frames nur lesen).
     """
+    FPS = 20.0
 
     def __init__(self, led):
         self.led = led
@@ -88,18 +166,7 @@ class TextRenderer:
 
     @staticmethod
     def _load_font(size: int) -> ImageFont.FreeTypeFont:
-        candidates = [
-            "DejaVuSans.ttf",
-            "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-            "/System/Library/Fonts/Supplemental/Arial Unicode.ttf",
-            "Arial Unicode.ttf",
-        ]
-        for fp in candidates:
-            try:
-                return ImageFont.truetype(fp, size=size)
-            except Exception:
-                continue
-        return ImageFont.load_default()
+        return load_font(size)
 
     def render_once(
         self,
@@ -119,11 +186,33 @@ class TextRenderer:
         if not W or not H:
             W, H = 128, 64
 
+        key = (text, color, bg, font_size, speed_px_s, duration, align_h, align_v, W, H)
+        plan = TEXT_PLANS.get(key)
+        if plan is None:
+            plan = self._compile(text=text, color=color, bg=bg, font_size=font_size,
+                                 speed_px_s=speed_px_s, duration=duration,
+                                 align_h=align_h, align_v=align_v, W=W, H=H)
+            TEXT_PLANS.put(key, plan)
+
+        if plan.strip is None:
+            for _ in range(plan.frames):
+                yield plan.frame
+            return
+
+        strip = plan.strip
+        buf = np.empty((H, W, 3), dtype=np.uint8)
+        for off in plan.offsets:
+            np.copyto(buf, strip[:, off:off + W])
+            yield buf
+
+    def _compile(self, *, text, color, bg, font_size, speed_px_s, duration,
+                 align_h, align_v, W: int, H: int) -> TextPlan:
+        """Vermessen und einmal rendern (statisches Frame bzw. Lauftext-Streifen)."""
         fg = self._parse_color(color, (255, 255, 255))
         bgc = self._parse_color(bg, (0, 0, 0))
         font = self._load_font(int(font_size or 24))
 
-        fps = 20.0
+        fps = self.FPS
         interval = 1.0 / fps
         spacing = max(0, int(font.size * 0.25))
 
@@ -154,7 +243,6 @@ class TextRenderer:
 
         if max_line_w <= W:
             wait_s = max(1.0, float(duration or 10))
-            t_end = time.time() + wait_s
             img = Image.new("RGB", (W, H), bgc)
             draw = ImageDraw.Draw(img)
             y = y0
@@ -168,10 +256,8 @@ class TextRenderer:
                 draw.text((x - l, y), line, fill=fg, font=font)
                 y += h + spacing
             frame = np.array(img, dtype=np.uint8)
-            while time.time() < t_end:
-                yield frame
-                time.sleep(interval)
-            return
+            frame.flags.writeable = False
+            return TextPlan(W, H, frame=frame, frames=max(1, int(wait_s * fps)))
 
         block_w = max_line_w
         block_h = block_h_bbox 
@@ -196,15 +282,18 @@ class TextRenderer:
         else:
             y_top = (H - block_h) // 2
 
+        # Streifen [Hintergrund W | Text | Hintergrund W]: Text bei x_left auf
+        # der Wand entspricht dem Ausschnitt ab Spalte W - x_left.
+        strip_img = Image.new("RGB", (block_w + 2 * W, H), bgc)
+        strip_img.paste(text_img, (W, int(y_top)), text_img)
+        strip = np.array(strip_img, dtype=np.uint8)
+        strip.flags.writeable = False
+        max_off = block_w + W
+
         speed = max(10.0, float(speed_px_s or 40))
         total_px = block_w + W
         total_time = total_px / speed
         total_frames = max(1, int(total_time * fps))
-        x_left = float(W)
-
-        for _ in range(total_frames):
-            img = Image.new("RGB", (W, H), bgc)
-            img.paste(text_img, (int(round(x_left)), int(y_top)), text_img)
-            yield np.array(img, dtype=np.uint8)
-            x_left -= speed * interval
-            time.sleep(interval)
+        x_left = W - speed * interval * np.arange(total_frames)
+        offsets = np.clip(W - np.round(x_left).astype(np.int64), 0, max_off).astype(np.int32)
+        return TextPlan(W, H, strip=strip, offsets=offsets)
@@ -0,0 +1,180 @@
+import hashlib, logging, os, shutil, subprocess, threading, time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from ..config import MEDIA_DIR
+from .playlists import is_video
+from .ffmpeg_pipe import scale_filter
+
+log = logging.getLogger(__name__)
+
+TRANSCODE_DIR = os.path.join(MEDIA_DIR, ".transcode")
+MODES = ("fill", "fit")
+
+
+class TranscodeCache:
+    """
+    Kopien der Videos in exakt Wandauflösung und Ziel-FPS (ffmpeg, Hintergrund).
+    Pro Quelle entstehen in einem Durchlauf beide Varianten (fill = zuschneiden,
+    fit = Letterbox), der Pi dekodiert beim Abspielen dann nur noch Panelgröße.
+
+    Dateiname = Hash aus Pfad, mtime, Größe, Wandgröße und FPS – ändert sich
+    Quelle oder Layout, passt der Schlüssel nicht mehr und die alte Kopie wird
+    beim nächsten schedule_all() weggeräumt.
+    """
+
+    def __init__(self, root: str = TRANSCODE_DIR):
+        self.root = root
+        self.cfg = {"enabled": True, "fps": 25, "crf": 20, "preset": "veryfast"}
+        self.ffmpeg = shutil.which("ffmpeg")
+        self._q: deque = deque()
+        self._queued = set()
+        self._failed = set()        # Schlüssel, an denen ffmpeg gescheitert ist
+        self._cv = threading.Condition()
+        self._thread = None
+        self.st = {"hits": 0, "misses": 0, "jobs": 0, "failed": 0, "last_ms": 0.0}
+        self.current: Optional[str] = None
+
+    def configure(self, cfg: Optional[Dict[str, Any]]):
+        if cfg:
+            self.cfg.update({k: v for k, v in cfg.items() if v is not None})
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.cfg.get("enabled", True)) and self.ffmpeg is not None
+
+    # --- Schlüssel ---
+    def _key(self, src: str, W: int, H: int) -> Optional[str]:
+        try:
+            st = os.stat(src)
+        except OSError:
+            return None
+        k = f"{os.path.abspath(src)}|{st.st_mtime_ns}|{st.st_size}|{W}x{H}|{self.cfg.get('fps')}"
+        return hashlib.sha256(k.encode("utf-8")).hexdigest()[:16]
+
+    def _path(self, key: str, mode: str) -> str:
+        return os.path.join(self.root, f"{key}_{mode}.mp4")
+
+    # --- Player ---
+    def lookup(self, src: str, W: int, H: int, mode: str = "fill") -> Optional[str]:
+        """Pfad der passenden Kopie oder None (dann wird sie im Hintergrund erzeugt)."""
+        if not self.enabled or not is_video(src):
+            return None
+        key = self._key(src, W, H)
+        if not key:
+            return None
+        p = self._path(key, mode if mode in MODES else "fill")
+        if os.path.exists(p):
+            self.st["hits"] += 1
+            return p
+        self.st["misses"] += 1
+        self.schedule(src, W, H)
+        return None
+
+    # --- Jobs ---
+    def schedule(self, src: str, W: int, H: int):
+        if not self.enabled or not is_video(src) or W <= 0 or H <= 0:
+            return
+        key = self._key(src, W, H)
+        if not key or all(os.path.exists(self._path(key, m)) for m in MODES):
+            return
+        with self._cv:
+            if key in self._queued or key in self._failed:
+                return
+            self._queued.add(key)
+            self._q.append((key, src, W, H))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="transcode")
+                self._thread.start()
+            self._cv.notify()
+
+    def schedule_all(self, W: int, H: int, media_dir: str = MEDIA_DIR):
+        """Alle Videos für die aktuelle Wandgröße einplanen, veraltete Kopien löschen."""
+        if not self.enabled:
+            return
+        keep = set()
+        for dirpath, dirs, files in os.walk(media_dir):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for fn in files:
+                if fn.startswith(".") or not is_video(fn):
+                    continue
+                src = os.path.join(dirpath, fn)
+                key = self._key(src, W, H)
+                if key:
+                    keep.add(key)
+                    self.schedule(src, W, H)
+        self._prune(keep)
+
+    def _prune(self, keep: set):
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return
+        with self._cv:
+            keep = keep | self._queued
+        for fn in names:
+            if fn.lstrip(".").split("_", 1)[0] not in keep:
+                try:
+                    os.remove(os.path.join(self.root, fn))
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cv:
+            s = dict(self.st, queued=len(self._q), current=self.current)
+        s["enabled"] = self.enabled
+        s["last_ms"] = round(s["last_ms"], 1)
+        return s
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while not self._q:
+                    self._cv.wait()
+                key, src, W, H = self._q.popleft()
+                self.current = os.path.basename(src)
+            try:
+                self._transcode(key, src, W, H)
+            finally:
+                with self._cv:
+                    self._queued.discard(key)
+                    self.current = None
+
+    def _transcode(self, key: str, src: str, W: int, H: int):
+        os.makedirs(self.root, exist_ok=True)
+        fps = float(self.cfg.get("fps") or 25)
+        crf = str(int(self.cfg.get("crf") or 20))
+        preset = str(self.cfg.get("preset") or "veryfast")
+        tmp = {m: os.path.join(self.root, f".{key}_{m}.tmp.mp4") for m in MODES}
+        graph = (f"[0:v]fps={fps:g},split=2[a][b];"
+                 f"[a]{scale_filter(W, H, 'fill')}[fill];"
+                 f"[b]{scale_filter(W, H, 'fit')}[fit]")
+        nice = shutil.which("nice")
+        cmd = ([nice, "-n", "10"] if nice else []) + [self.ffmpeg, "-nostdin", "-v", "error", "-y", "-i", src, "-filter_complex", graph]
+        for m in MODES:
+            cmd += ["-map", f"[{m}]", "-an", "-c:v", "libx264", "-preset", preset, "-crf", crf,
+                    "-pix_fmt", "yuv420p", tmp[m]]
+        t0 = time.perf_counter()
+        try:
+            r = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            if r.returncode != 0:
+                raise RuntimeError(r.stderr.decode("utf-8", "ignore").strip()[-300:])
+            for m in MODES:
+                os.replace(tmp[m], self._path(key, m))
+            self.st["jobs"] += 1
+            self.st["last_ms"] = (time.perf_counter() - t0) * 1000.0
+            log.info("transcoded %s -> %dx%d@%g (%.1fs)", os.path.basename(src), W, H, fps,
+                     time.perf_counter() - t0)
+        except Exception as e:
+            self.st["failed"] += 1
+            with self._cv:
+                self._failed.add(key)
+            log.warning("transcode %s failed: %s", src, e)
+        finally:
+            for p in tmp.values():
+                if os.path.exists(p):
+                    try: os.remove(p)
+                    except OSError: pass
+
+
+TRANSCODER = TranscodeCache()
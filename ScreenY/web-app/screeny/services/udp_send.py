@@ -0,0 +1,279 @@
+import ctypes, ctypes.util, errno, socket, sys, threading, time, logging
+from typing import Dict, Optional, Sequence, Tuple
+
+log = logging.getLogger(__name__)
+
+# Linux: UIO_MAXIOV – mehr Nachrichten nimmt sendmmsg() pro Aufruf nicht an
+MMSG_MAX = 1024
+# so lange werden EAGAIN/ENOBUFS wiederholt, danach gilt der Burst als verloren
+RETRY_S = 0.05
+
+
+class SendBackend:
+    """
+    Basis für die UDP-Sendepfade des LedBroadcaster.
+    send_burst() schickt eine Paketliste (Frame) plus optionale Zusatzpakete
+    (tail, z.B. SYNC) an eine Adresse und liefert die Anzahl der dafür
+    nötigen Syscalls zurück.
+    burst / gap_s: optionales Pacing zwischen Teil-Bursts, damit die
+    Empfangspuffer der Controller nicht überlaufen.
+    """
+    name = "base"
+
+    def __init__(self, sock: socket.socket, burst: int = 0, gap_s: float = 0.0):
+        self.sock = sock
+        self.burst = max(0, int(burst or 0))
+        self.gap_s = max(0.0, float(gap_s or 0.0))
+        self.syscalls = 0
+        self.packets = 0
+
+    def send_one(self, b, addr):
+        self.sock.sendto(b, addr)
+        self.syscalls += 1
+        self.packets += 1
+
+    def send_burst(self, packets: Sequence, addr, tail: Sequence = ()) -> int:
+        raise NotImplementedError
+
+
+class LockedSendBackend(SendBackend):
+    """Altes Verhalten: ein sendto() pro Paket unter einem Lock."""
+    name = "locked"
+
+    def __init__(self, sock, burst=0, gap_s=0.0):
+        super().__init__(sock, burst, gap_s)
+        self._lock = threading.Lock()
+
+    def send_one(self, b, addr):
+        with self._lock:
+            self.sock.sendto(b, addr)
+        self.syscalls += 1
+        self.packets += 1
+
+    def send_burst(self, packets, addr, tail=()) -> int:
+        for b in packets:
+            self.send_one(b, addr)
+        for b in tail:
+            self.send_one(b, addr)
+        return len(packets) + len(tail)
+
+
+class LoopSendBackend(SendBackend):
+    """Enge sendto()-Schleife ohne Lock (Datagramme sind ohnehin atomar)."""
+    name = "loop"
+
+    def send_burst(self, packets, addr, tail=()) -> int:
+        sendto = self.sock.sendto
+        n = len(packets)
+        step = self.burst or n or 1
+        for i in range(0, n, step):
+            if i and self.gap_s > 0:
+                time.sleep(self.gap_s)
+            for b in packets[i:i + step]:
+                sendto(b, addr)
+        for b in tail:
+            sendto(b, addr)
+        n += len(tail)
+        self.syscalls += n
+        self.packets += n
+        return n
+
+
+# ------------------------------------------------
+# sendmmsg() über ctypes (Linux)
+# ------------------------------------------------
+class _IoVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p), ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IoVec)), ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p), ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+class _SockAddrIn(ctypes.Structure):
+    _fields_ = [("sin_family", ctypes.c_ushort), ("sin_port", ctypes.c_uint16),
+                ("sin_addr", ctypes.c_ubyte * 4), ("sin_zero", ctypes.c_ubyte * 8)]
+
+
+def _load_sendmmsg():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        fn = libc.sendmmsg
+    except (OSError, AttributeError):
+        return None
+    fn.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int]
+    fn.restype = ctypes.c_int
+    return fn
+
+_sendmmsg = _load_sendmmsg()
+
+
+class _MmsgBatch:
+    """
+    mmsghdr/iovec-Arrays für eine feste Paketliste (Adressen bleiben stabil)
+    plus TAIL freie Plätze für Zusatzpakete, die pro Aufruf gesetzt werden.
+    rebind/set/sendmmsg nur unter `lock` – die Arrays sind geteilter Zustand.
+    """
+    TAIL = 8
+
+    def __init__(self, packets: Sequence, name: _SockAddrIn):
+        self.lock = threading.Lock()
+        self.n = n = len(packets)
+        self.src = packets                      # hält die Puffer am Leben
+        self.iov = (_IoVec * (n + self.TAIL))()
+        self.msgs = (_MMsgHdr * (n + self.TAIL))()
+        self.name = name
+        self.bufs = []
+        for i, b in enumerate(packets):
+            self.set(i, b)
+
+    def rebind(self, packets: Sequence):
+        """Gleiche Paketzahl, neue Liste (z.B. JPEG mit anderer Größe): Zeiger neu setzen."""
+        self.src = packets
+        for i, b in enumerate(packets):
+            self.set(i, b)
+
+    def set(self, i: int, b):
+        mv = b if isinstance(b, memoryview) else memoryview(b)
+        if mv.readonly:
+            mv = memoryview(bytearray(mv))
+        cb = (ctypes.c_char * mv.nbytes).from_buffer(mv)
+        if i < len(self.bufs):
+            self.bufs[i] = cb
+        else:
+            self.bufs.append(cb)
+        self.iov[i].iov_base = ctypes.addressof(cb)
+        self.iov[i].iov_len = mv.nbytes
+        h = self.msgs[i].msg_hdr
+        h.msg_name = ctypes.addressof(self.name)
+        h.msg_namelen = ctypes.sizeof(self.name)
+        h.msg_iov = ctypes.pointer(self.iov[i])
+        h.msg_iovlen = 1
+
+
+class MmsgSendBackend(SendBackend):
+    """
+    Ein sendmmsg()-Syscall pro Teil-Burst. Die Batch-Strukturen werden pro
+    Paketzahl und Ziel gecacht (FramePacketizer liefert stabile Puffer; bei
+    JPEG ändert sich nur die Liste, dann werden nur die Zeiger neu gesetzt),
+    kurze Zusatzpakete (SYNC) landen in den freien Tail-Plätzen desselben
+    Batches. EAGAIN/ENOBUFS werden bis RETRY_S wiederholt, danach OSError.
+
+    Threadsicher: der Cache steht unter _lock, jeder Batch hat seinen eigenen
+    Lock – gleichzeitige Bursts mit gleicher Paketzahl ans selbe Ziel laufen
+    nacheinander, Fan-out an verschiedene Controller weiter parallel.
+    """
+    name = "sendmmsg"
+
+    def __init__(self, sock, burst=0, gap_s=0.0):
+        super().__init__(sock, burst, gap_s)
+        if _sendmmsg is None:
+            raise OSError("sendmmsg not available")
+        self._lock = threading.Lock()
+        self._names: Dict[Tuple[str, int], _SockAddrIn] = {}
+        self._batches: Dict[Tuple[int, Tuple[str, int]], _MmsgBatch] = {}
+
+    def _sockaddr(self, addr) -> _SockAddrIn:
+        sa = self._names.get(addr)
+        if sa is None:
+            sa = _SockAddrIn()
+            sa.sin_family = socket.AF_INET
+            sa.sin_port = socket.htons(int(addr[1]))
+            sa.sin_addr[:] = socket.inet_aton(socket.gethostbyname(addr[0]))
+            self._names[addr] = sa
+        return sa
+
+    def _batch(self, packets, addr) -> _MmsgBatch:
+        """Gecachter Batch; rebind() erst der Aufrufer unter batch.lock."""
+        key = (len(packets), addr)
+        with self._lock:
+            b = self._batches.get(key)
+            if b is None:
+                if len(self._batches) > 32:
+                    self._batches.clear()   # wer noch einen Batch hält, behält dessen Arrays
+                b = _MmsgBatch(packets, self._sockaddr(addr))
+                self._batches[key] = b
+        return b
+
+    def _flush(self, batch: _MmsgBatch, start: int, count: int) -> int:
+        fd = self.sock.fileno()
+        calls = 0
+        size = ctypes.sizeof(_MMsgHdr)
+        base = ctypes.addressof(batch.msgs)
+        t_end = None
+        while count > 0:
+            r = _sendmmsg(fd, base + start * size, min(count, MMSG_MAX), 0)
+            calls += 1
+            if r < 0:
+                e = ctypes.get_errno()
+                if e in (errno.EAGAIN, errno.ENOBUFS, errno.EINTR):
+                    now = time.perf_counter()
+                    t_end = t_end or now + RETRY_S
+                    if now < t_end:
+                        time.sleep(0.0005)
+                        continue
+                raise OSError(e, f"sendmmsg: {errno.errorcode.get(e, e)}")
+            t_end = None
+            start += r
+            count -= r
+        return calls
+
+    def send_burst(self, packets, addr, tail=()) -> int:
+        if len(tail) > _MmsgBatch.TAIL:
+            calls = self.send_burst(packets, addr)
+            return calls + self.send_burst(list(tail), addr)
+        if isinstance(packets, list) and packets and isinstance(packets[0], memoryview) \
+                and not packets[0].readonly:
+            batch = self._batch(packets, addr)
+        else:
+            # fremde/kurzlebige Pakete: nicht cachen
+            with self._lock:
+                batch = _MmsgBatch(packets, self._sockaddr(addr))
+        with batch.lock:
+            if batch.src is not packets:
+                batch.rebind(packets)
+            n = batch.n
+            for j, b in enumerate(tail):
+                batch.set(n + j, b)
+            total = n + len(tail)
+            step = self.burst or total or 1
+            calls = 0
+            for i in range(0, total, step):
+                if i and self.gap_s > 0:
+                    time.sleep(self.gap_s)
+                calls += self._flush(batch, i, min(step, total - i))
+        with self._lock:
+            self.syscalls += calls
+            self.packets += total
+        return calls
+
+
+BACKENDS = {
+    "locked": LockedSendBackend,
+    "loop": LoopSendBackend,
+    "sendmmsg": MmsgSendBackend,
+}
+
+
+def make_backend(name: Optional[str], sock, *, burst: int = 0, gap_s: float = 0.0) -> SendBackend:
+    """name: auto | sendmmsg | loop | locked"""
+    n = (name or "auto").strip().lower()
+    if n == "auto":
+        n = "sendmmsg" if _sendmmsg is not None else "loop"
+    cls = BACKENDS.get(n)
+    if cls is None:
+        log.warning("unknown send backend %r, using loop", name)
+        cls = LoopSendBackend
+    try:
+        return cls(sock, burst=burst, gap_s=gap_s)
+    except OSError as e:
+        log.warning("send backend %s unavailable (%s), using loop", n, e)
+        return LoopSendBackend(sock, burst=burst, gap_s=gap_s)
@@ -3,6 +3,7 @@
 import time
 import requests
 import math, requests
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
 
@@ -117,15 +118,17 @@ def _draw_weather_icon(dr: ImageDraw.ImageDraw, x: int, y: int, kind: str, size:
     elif k=="thunder": cloud(); bolt()
     else: cloud()
 
-def render_clock_panel(size=(128,128), *, show_seconds=True, show_date=False, weather=None, city=""):
-    im = Image.new("RGB", size, (0,0,0)); dr = ImageDraw.Draw(im); w,h=size
-    f_big   = ImageFont.load_default(); f_small = ImageFont.load_default()
+TIME_REF = "88:88:88"   # Layout-Höhe der Zeitzeile, unabhängig von den aktuellen Ziffern
 
-    now = time.localtime()
-    timestr = time.strftime("%H:%M:%S" if show_seconds else "%H:%M", now)
-    tw,th = _measure(dr, timestr, f_big)
+
+def _draw_clock(dr: ImageDraw.ImageDraw, w: int, h: int, timestr, th: int, f_big, f_small, *,
+                now, show_date=False, weather=None, city=""):
+    """Zeichnet das Uhr-Panel; timestr=None lässt die Uhrzeit aus (statische Ebene)."""
     y = 2
-    dr.text(((w - tw)//2, y), timestr, fill=(255,255,255), font=f_big); y += th + 1
+    if timestr:
+        tw, _ = _measure(dr, timestr, f_big)
+        dr.text(((w - tw)//2, y), timestr, fill=(255,255,255), font=f_big)
+    y += th + 1
     if show_date:
         datestr = time.strftime("%d.%m.%Y", now)
         dw,dh = _measure(dr, datestr, f_small)
@@ -150,4 +153,79 @@ def render_clock_panel(size=(128,128), *, show_seconds=True, show_date=False, we
             rng  = f"{int(round(tmin))}/{int(round(tmax))}°C" if (tmin is not None and tmax is not None) else "—"
             dr.text((4+18+16, y2), f"{label}: {rng}", fill=(200,220,255), font=f_small)
             y2 += 24
+
+def render_clock_panel(size=(128,128), *, show_seconds=True, show_date=False, weather=None, city=""):
+    im = Image.new("RGB", size, (0,0,0)); dr = ImageDraw.Draw(im); w,h=size
+    f_big   = ImageFont.load_default(); f_small = ImageFont.load_default()
+
+    now = time.localtime()
+    timestr = time.strftime("%H:%M:%S" if show_seconds else "%H:%M", now)
+    _, th = _measure(dr, TIME_REF, f_big)
+    _draw_clock(dr, w, h, timestr, th, f_big, f_small, now=now,
+                show_date=show_date, weather=weather, city=city)
     return im
+
+
+class ClockRenderer:
+    """
+    Uhr-Panel in zwei Ebenen für den Player:
+    - statisch (Stadt, Wettericons, Vorhersage, Datum): nur neu gezeichnet,
+      wenn sich Wetterdaten, Datum oder Größe/Variante ändern
+    - Uhrzeit: pro Sekunde wird nur die Box der Ziffern (vereinigt mit der
+      vorherigen) aus der statischen Ebene restauriert und neu beschriftet
+
+    render() liefert immer denselben BGR-Puffer (H x W x 3) – nur lesen,
+    gültig bis zum nächsten Aufruf.
+    """
+
+    def __init__(self):
+        self.f_big = ImageFont.load_default()
+        self.f_small = ImageFont.load_default()
+        self._key = None
+        self._static = None     # BGR, ohne Uhrzeit
+        self.buf = None         # BGR, wird gesendet
+        self._dr = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+        self._th = 0
+        self._time = None
+        self._box = None        # (x0, y0, x1, y1) der zuletzt gezeichneten Uhrzeit
+
+    def render(self, size=(128,128), *, show_seconds=True, show_date=False, weather=None, city=""):
+        w, h = size
+        now = time.localtime()
+        key = (size, show_date, time.strftime("%Y%m%d", now) if show_date else None,
+               city, repr(weather) if weather else None)
+        if key != self._key:
+            self._build_static(w, h, now, show_date, weather, city)
+            self._key = key
+
+        timestr = time.strftime("%H:%M:%S" if show_seconds else "%H:%M", now)
+        if timestr != self._time:
+            self._draw_time(w, h, timestr)
+        return self.buf
+
+    def _build_static(self, w, h, now, show_date, weather, city):
+        im = Image.new("RGB", (w, h), (0,0,0)); dr = ImageDraw.Draw(im)
+        _, self._th = _measure(dr, TIME_REF, self.f_big)
+        _draw_clock(dr, w, h, None, self._th, self.f_big, self.f_small, now=now,
+                    show_date=show_date, weather=weather, city=city)
+        self._static = np.ascontiguousarray(np.asarray(im)[:, :, ::-1])
+        self.buf = self._static.copy()
+        self._time = None
+        self._box = None
+
+    def _draw_time(self, w, h, timestr):
+        tw, _ = _measure(self._dr, timestr, self.f_big)
+        x, y = (w - tw)//2, 2
+        l, t, r, b = self._dr.textbbox((x, y), timestr, font=self.f_big)
+        box = (max(0, l), max(0, t), min(w, r), min(h, b))
+        # alte Ziffern mit abdecken (Breite kann sich bei Proportionalschrift ändern)
+        if self._box:
+            ob = self._box
+            box = (min(box[0], ob[0]), min(box[1], ob[1]), max(box[2], ob[2]), max(box[3], ob[3]))
+        x0, y0, x1, y1 = box
+        if x1 > x0 and y1 > y0:
+            patch = Image.fromarray(np.ascontiguousarray(self._static[y0:y1, x0:x1, ::-1]))
+            ImageDraw.Draw(patch).text((x - x0, y - y0), timestr, fill=(255,255,255), font=self.f_big)
+            self.buf[y0:y1, x0:x1] = np.asarray(patch)[:, :, ::-1]
+        self._box = (max(0, l), max(0, t), min(w, r), min(h, b))
+        self._time = timestr
@@ -0,0 +1,111 @@
+import logging
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from .scheduler import TZ
+
+log = logging.getLogger(__name__)
+
+INF = float("inf")
+
+
+def _ts(s) -> Optional[float]:
+    """ISO-Zeit aus dem Editor (datetime-local, ohne Zone = TZ) -> Unix-Zeit."""
+    s = (s or "").strip() if isinstance(s, str) else s
+    if not s:
+        return None
+    try:
+        dt = datetime.fromisoformat(s)
+    except (TypeError, ValueError):
+        log.warning("playlist: invalid start/end %r ignored", s)
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=TZ)
+    return dt.timestamp()
+
+
+class ItemWindows:
+    """
+    Start/Ende-Fenster der Playlist-Items, beim Laden einmal kompiliert.
+
+    Alle Grenzen (Starts und Enden) liegen sortiert in `bounds`; zwischen zwei
+    Grenzen ändert sich die Menge der spielbaren Items nicht. Für jedes dieser
+    Segmente steht schon nach dem Laden fest, welche Items mit Fenster darin
+    spielbar sind, set_order() legt sie als sortierte Positionslisten ab. Zur
+    Laufzeit kostet die Suche nach dem nächsten spielbaren Item nur noch
+    bisects (Segment über `bounds`, Position im Segment und unter den Items
+    ohne Fenster).
+
+        win = ItemWindows(items)
+        win.set_order(order)                 # nach jedem shuffle
+        pos = win.find(time.time(), pos)     # None = bis Listenende nichts
+        t = win.next_change(time.time())     # None = ändert sich nie mehr
+
+    Items ohne Fenster sind immer spielbar, fehlt nur start oder end, ist das
+    Fenster nach einer Seite offen.
+    """
+
+    def __init__(self, items: Sequence[Dict[str, Any]]):
+        self.n = len(items)
+        self.always: List[int] = []
+        self.windowed = []          # (start, end, item_idx)
+        bounds = set()
+        for i, it in enumerate(items):
+            s, e = _ts(it.get("start")), _ts(it.get("end"))
+            if s is None and e is None:
+                self.always.append(i)
+                continue
+            s = -INF if s is None else s
+            e = INF if e is None else e
+            if e <= s:
+                log.warning("playlist item %d: end before start, window ignored", i)
+                self.always.append(i)
+                continue
+            self.windowed.append((s, e, i))
+            bounds.update(b for b in (s, e) if b not in (-INF, INF))
+        self.bounds = sorted(bounds)
+        # Segment k = [bounds[k-1], bounds[k]) -> Items mit Fenster, die dort spielbar sind
+        nseg = len(self.bounds) + 1
+        self._seg_items: List[List[int]] = [[] for _ in range(nseg)]
+        for s, e, i in self.windowed:
+            k0 = 0 if s == -INF else bisect_right(self.bounds, s)
+            k1 = nseg if e == INF else bisect_right(self.bounds, e)
+            for k in range(k0, k1):
+                self._seg_items[k].append(i)
+        self._always_pos: List[int] = []
+        self._seg_pos: List[List[int]] = []
+        self.set_order(range(self.n))
+
+    @property
+    def active(self) -> bool:
+        return bool(self.windowed)
+
+    def set_order(self, order: Sequence[int]):
+        """Abspielreihenfolge (Positionen -> Item-Index) übernehmen."""
+        pos_of = [0] * self.n
+        for p, i in enumerate(order):
+            pos_of[i] = p
+        self._always_pos = sorted(pos_of[i] for i in self.always)
+        self._seg_pos = [sorted(pos_of[i] for i in items) for items in self._seg_items]
+
+    def any(self, t: float) -> bool:
+        return bool(self._always_pos) or bool(self._seg_pos[bisect_right(self.bounds, t)])
+
+    def find(self, t: float, pos: int, back: bool = False) -> Optional[int]:
+        """Erste spielbare Position >= pos (back: <= pos), sonst None."""
+        found = None
+        for el in (self._always_pos, self._seg_pos[bisect_right(self.bounds, t)]):
+            if back:
+                k = bisect_right(el, pos)
+                if k and (found is None or el[k - 1] > found):
+                    found = el[k - 1]
+            else:
+                k = bisect_left(el, pos)
+                if k < len(el) and (found is None or el[k] < found):
+                    found = el[k]
+        return found
+
+    def next_change(self, t: float) -> Optional[float]:
+        k = bisect_right(self.bounds, t)
+        return self.bounds[k] if k < len(self.bounds) else None
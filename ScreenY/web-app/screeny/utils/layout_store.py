@@ -22,7 +22,15 @@ def send_active_layout(app, *, line_nums) -> bool:
             logger.warning(f"[send_active_layout] kein Layout gefunden {PANEL_LAYOUT_FILE} – nichts gesendet")
             return False
 
-        app.state.LED.send_config_layout(
+        led = app.state.LED
+        if layout.get("dest_ip"):
+            led.set_destination(layout["dest_ip"])
+        if (led.transport.get("dest") or "broadcast") != "broadcast" and not led.modules:
+            # Unicast/Split braucht die Controller-IPs aus der Registrierung;
+            # bis die da sind, geht es per Broadcast raus
+            led.discover_async(1.0)
+
+        led.send_config_layout(
             grid_cols=layout["grid_cols"],
             grid_rows=layout["grid_rows"],
             panel_w=layout["panel_w"],